@@ -1,9 +1,22 @@
+import signal
+import sys
 from extensions import app, socketio, db
 from routes import routes  # Importez les routes après l'initialisation des extensions
+from routes import api, shards
+from services import ingestion  # Commande flask import-resultats
+from services import traces
+
+# Enregistre les événements reçus si TRACE_FILE est défini
+traces.installer()
 
 # Initialisation de la base de données
 with app.app_context():
     db.create_all()
 
 if __name__ == "__main__":
-    socketio.run(app, debug=True)
\ No newline at end of file
+    # Reprise des parties du worker précédent, sauvegarde des parties en cours à l'arrêt (SIGTERM).
+    # Sans rechargement automatique : le processus du rechargeur tuerait ce serveur sans lui laisser sauvegarder.
+    # Sous gunicorn, les mêmes étapes passent par gunicorn.conf.py
+    shards.restaurer()
+    signal.signal(signal.SIGTERM, lambda *_: (shards.arreter(), sys.exit(0)))
+    socketio.run(app, debug=True, use_reloader=False)
\ No newline at end of file
@@ -0,0 +1,120 @@
+import asyncio
+import os
+import threading
+
+# Le serveur Socket.IO de Flask-SocketIO n'est pas utilisé ici : pas d'eventlet ni de monkeypatch
+os.environ.setdefault("ASYNC_MODE", "threading")
+
+import socketio as python_socketio
+from asgiref.wsgi import WsgiToAsgi
+from app import app, socketio
+from routes import shards
+
+
+# Le code des parties suppose qu'un seul gestionnaire s'exécute à la fois, comme sous le hub eventlet.
+# Gestionnaires Socket.IO, requêtes HTTP et tâches de fond prennent ce verrou et ne le relâchent qu'en dormant.
+verrou = threading.Lock()
+
+
+class Passerelle:
+    # Remplace le serveur synchrone de Flask-SocketIO : les appels faits depuis les
+    # gestionnaires (emit, join_room, tâches de fond) sont transmis à l'AsyncServer.
+
+    async_mode = "asgi"
+
+    def __init__(self, serveur):
+        self.serveur = serveur
+        self.boucle = None
+
+    def _sur_la_boucle(self, coroutine):
+        return asyncio.run_coroutine_threadsafe(coroutine, self.boucle)
+
+    def emit(self, event, *args, **kwargs):
+        # Sans attente : l'ordre des envois est conservé par la boucle
+        self._sur_la_boucle(self.serveur.emit(event, *args, **kwargs))
+
+    def enter_room(self, sid, room, namespace=None):
+        self._sur_la_boucle(self.serveur.enter_room(sid, room, namespace=namespace)).result()
+
+    def leave_room(self, sid, room, namespace=None):
+        self._sur_la_boucle(self.serveur.leave_room(sid, room, namespace=namespace)).result()
+
+    def close_room(self, room, namespace=None):
+        self._sur_la_boucle(self.serveur.close_room(room, namespace=namespace)).result()
+
+    def rooms(self, sid, namespace=None):
+        return self.serveur.rooms(sid, namespace=namespace)
+
+    def disconnect(self, sid, namespace=None):
+        self._sur_la_boucle(self.serveur.disconnect(sid, namespace=namespace))
+
+    def get_environ(self, sid, namespace=None):
+        environ = self.serveur.get_environ(sid, namespace=namespace)
+        if environ is not None:
+            environ.setdefault("flask.app", app)
+            environ.setdefault("wsgi.url_scheme", environ["asgi.scope"].get("scheme", "http").replace("ws", "http"))
+        return environ
+
+    def start_background_task(self, target, *args, **kwargs):
+        def tache():
+            with verrou:
+                target(*args, **kwargs)
+
+        fil = threading.Thread(target=tache, daemon=True)
+        fil.start()
+        return fil
+
+    def sleep(self, seconds=0):
+        # Équivalent d'un changement de greenlet : les autres gestionnaires passent pendant l'attente
+        verrou.release()
+        try:
+            threading.Event().wait(seconds)
+        finally:
+            verrou.acquire()
+
+
+def _executer(handler, *args):
+    with verrou:
+        return handler(*args)
+
+
+def _relais(handler):
+    async def relais(sid, *args):
+        return await asyncio.to_thread(_executer, handler, sid, *args)
+    return relais
+
+
+serveur = python_socketio.AsyncServer(async_mode="asgi")
+passerelle = Passerelle(serveur)
+
+# Les gestionnaires déclarés avec @socketio.on sont repris tels quels
+for namespace, evenements in socketio.server.handlers.items():
+    for evenement, handler in evenements.items():
+        serveur.on(evenement, _relais(handler), namespace=namespace)
+socketio.server = passerelle
+
+
+def _flask(environ, start_response):
+    with verrou:
+        reponse = socketio.sockio_mw.wsgi_app(environ, start_response)
+        try:
+            return list(reponse)
+        finally:
+            if hasattr(reponse, "close"):
+                reponse.close()
+
+
+async def demarrage():
+    await asyncio.to_thread(_executer, shards.restaurer)
+
+
+async def arret():
+    await asyncio.to_thread(_executer, shards.arreter)
+
+
+_application = python_socketio.ASGIApp(serveur, other_asgi_app=WsgiToAsgi(_flask), on_startup=demarrage, on_shutdown=arret)
+
+
+async def application(scope, receive, send):
+    passerelle.boucle = asyncio.get_running_loop()
+    await _application(scope, receive, send)
@@ -1,14 +1,81 @@
+import os
 from flask import Flask
 from flask_socketio import SocketIO
 from models.user import db
+from services import assets
 
 # Initialisation des extensions
 app = Flask(__name__)
 app.secret_key = 'hubert_nicolas'
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///users.db'
+app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('DATABASE_URI', 'sqlite:///users.db')
+
+# Présence : délai de grâce après déconnexion et intervalle des envois groupés (secondes)
+app.config['PRESENCE_GRACE'] = 30
+app.config['PRESENCE_FLUSH'] = 1
+
+# Minuteurs : pas de l'échéancier commun à toutes les parties (secondes)
+app.config['SCHEDULER_TICK'] = 0.25
+
+# Limites de débit des événements Socket.IO : (capacité, recharge par seconde) par sid et par partie rejointe
+app.config['RATE_LIMITS'] = {
+    "default": {"sid": (10, 2), "room": (100, 20)},
+    "cast_vote": {"sid": (5, 1), "room": (60, 10)},
+    "add_problem": {"sid": (10, 1), "room": (30, 3)},
+    "add_problems": {"sid": (3, 0.2), "room": (10, 1)},
+    "upload_backlog": {"sid": (2, 0.1)},
+}
+app.config['RATE_LIMIT_IDLE'] = 60
+app.config['RATE_LIMIT_LOG_INTERVAL'] = 10  # Un avertissement au plus par seau sur cet intervalle
+
+# Intervalle d'envoi des trames fusionnées (update_votes) vers les parties (secondes)
+app.config['BROADCAST_INTERVAL'] = 0.2
+
+# Nombre maximum de problèmes par opération groupée
+app.config['PROBLEM_BATCH_MAX'] = 1000
+
+# Intervalle minimum entre deux résumés envoyés aux spectateurs (secondes)
+app.config['SPECTATOR_INTERVAL'] = 2
+
+# Salon des parties ouvertes : taille d'une page et intervalle d'envoi des différences (secondes)
+app.config['LOBBY_PAGE'] = 50
+app.config['LOBBY_INTERVAL'] = 1
+
+# Répartition des parties entre workers (vide : un seul worker détient toutes les parties)
+# SHARDS="http://hote:5000,http://hote:5001" et SHARD_URL=adresse de ce worker parmi SHARDS
+app.config['SHARDS'] = [shard for shard in os.environ.get('SHARDS', '').split(',') if shard]
+app.config['SHARD_URL'] = os.environ.get('SHARD_URL', '')
+app.config['SHARD_TOKEN'] = os.environ.get('SHARD_TOKEN', '')
+app.config['SHARD_VNODES'] = 64
+app.config['SHARD_TIMEOUT'] = 5
+app.config['SHARD_TRANSFER_ATTEMPTS'] = 3  # Envois d'une partie modifiée pendant son transfert, ou sans réponse
+
+# Tirages d'un identifiant de partie libre et rattaché à ce worker avant d'abandonner
+app.config['GAME_ID_ATTEMPTS'] = 100
+
+# Instantané des parties écrit à l'arrêt du worker (dans le dossier instance) et rechargé au démarrage
+app.config['DRAIN_SNAPSHOT'] = os.environ.get('DRAIN_SNAPSHOT', 'parties.json')
+
+# Historique des votes en colonnes (dossier dans instance) et intervalle d'écriture (secondes)
+app.config['HISTORY_DIR'] = 'historique'
+app.config['HISTORY_FLUSH'] = 5
+
+# Statistiques d'estimation cumulées, sauvegardées à l'arrêt (dans instance)
+app.config['ANALYTICS_FILE'] = 'analytique.json'
+
+# Suggestions d'estimation : nombre de problèmes semblables retenus et similarité minimale (0 à 1)
+app.config['SUGGESTION_TOP'] = 5
+app.config['SUGGESTION_MIN_SCORE'] = 0.3
+
+# Enregistrement optionnel des événements Socket.IO reçus (rejoués par tools/replay.py)
+app.config['TRACE_FILE'] = os.environ.get('TRACE_FILE')
+
+# Fichiers statiques avec empreinte et précompressés au démarrage (static/build)
+app.config['ASSETS_BUILD'] = True
+
 db.init_app(app)
+assets.init_app(app)
 
-socketio = SocketIO(app, async_mode='eventlet')
+socketio = SocketIO(app, async_mode=os.environ.get('ASYNC_MODE', 'eventlet'))
 
 # Dictionnaire pour stocker les parties, les joueurs, les problèmes et les votes
 games = {}
@@ -0,0 +1,20 @@
+# gunicorn -c gunicorn.conf.py app:app
+# Un seul worker eventlet par processus : les parties sont en mémoire (plusieurs workers : SHARDS)
+worker_class = "eventlet"
+workers = 1
+bind = "0.0.0.0:5000"
+
+# Laisse le temps de sauvegarder les parties entre SIGTERM et l'arrêt forcé du worker
+graceful_timeout = 30
+
+
+def post_worker_init(worker):
+    # Reprise des parties sauvegardées par le worker précédent
+    from routes import shards
+    shards.restaurer()
+
+
+def worker_exit(server, worker):
+    # Appelé dans le worker à son arrêt (SIGTERM du maître ou redémarrage) : sauvegarde des parties en cours
+    from routes import shards
+    shards.arreter()
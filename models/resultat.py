@@ -0,0 +1,19 @@
+from models.user import db
+
+class Partie(db.Model):
+    __tablename__ = 'parties'
+    id = db.Column(db.Integer, primary_key=True)
+    game_id = db.Column(db.String(32), nullable=False, index=True)
+    mode = db.Column(db.String(32))
+    number_player = db.Column(db.Integer)
+    deck = db.Column(db.String(32))
+    # Fichier d'origine : une archive déjà importée est ignorée à la reprise
+    fichier = db.Column(db.String(512), unique=True, nullable=False)
+
+class Estimation(db.Model):
+    __tablename__ = 'estimations'
+    id = db.Column(db.Integer, primary_key=True)
+    partie_id = db.Column(db.Integer, db.ForeignKey('parties.id'), nullable=False, index=True)
+    position = db.Column(db.Integer, nullable=False)
+    probleme = db.Column(db.Text, nullable=False)
+    difficulte = db.Column(db.String(32))
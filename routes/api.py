@@ -0,0 +1,41 @@
+from flask import request, jsonify, redirect, url_for
+from extensions import app, games
+from services import etat, sharding, analytique
+
+
+## API HTTP en lecture seule : ne rejoint pas la partie et ne modifie pas "players"
+
+@app.route("/api/games/<game_id>")
+def api_game(game_id):
+    if not sharding.est_local(game_id):
+        return redirect(sharding.url(game_id, url_for("api_game", game_id=game_id)), code=307)
+
+    if game_id not in games:
+        return jsonify({"error": "La partie n'existe pas."}), 404
+
+    tag = etat.etag(game_id)
+    if request.if_none_match.contains(tag):
+        reponse = app.response_class(status=304)
+    else:
+        reponse = app.response_class(etat.instantane(game_id), mimetype="application/json")
+
+    reponse.set_etag(tag)
+    reponse.headers["Cache-Control"] = "no-cache"  # Toujours revalider, la réponse 304 ne coûte presque rien
+    return reponse
+
+
+## Statistiques d'estimation de ce worker, tenues à jour à chaque conclusion
+
+@app.route("/api/analytics/<portee>")
+def api_analytics(portee):
+    if portee not in analytique.PORTEES:
+        return jsonify({"error": "Portée inconnue."}), 404
+    return jsonify({cle: analytique.resume(compteurs) for cle, compteurs in analytique.stats[portee].items()})
+
+
+@app.route("/api/analytics/<portee>/<path:cle>")
+def api_analytics_cle(portee, cle):
+    compteurs = analytique.stats.get(portee, {}).get(cle)
+    if compteurs is None:
+        return jsonify({"error": "Aucune statistique."}), 404
+    return jsonify(analytique.resume(compteurs))
@@ -4,16 +4,31 @@ import os
 import sys
 from extensions import app, socketio, games, db
 from models.user import User
+from services import presence, scheduler, ratelimit, diffusion, decks, spectateurs, etat, salon, sharding, arret, identite, historique, analytique, suggestions
 import random
+import re
 import json
+import uuid
+from collections import Counter
 
 
-# Fonction pour générer un ID de partie unique
+# Fonction pour générer un ID de partie unique, rattaché au worker qui crée la partie (None si aucun n'est libre)
 def generate_unique_game_id():
-    while True:
+    for _ in range(app.config["GAME_ID_ATTEMPTS"]):
         game_id = str(random.randint(1000, 9999))
-        if game_id not in games:
+        if game_id not in games and sharding.est_local(game_id):
             return game_id
+    return None
+
+
+# Modes de jeu et libellés affichés dans la salle de jeu
+MODES = {
+    "strict": "Strict (Unanimité)",
+    "moyenne": "Moyenne",
+    "mediane": "Médiane",
+    "majorite_absolue": "Majorité absolue",
+    "majorite_relative": "Majorité relative",
+}
 
 
 
@@ -54,20 +69,51 @@ def dashboard():
         return redirect(url_for("signup"))
     
     if request.method == "POST":
+        # Une partie existante est gérée par son worker : la requête lui est transmise telle quelle
+        game_id = request.form.get("game_id")
+        if game_id and not sharding.est_local(game_id):
+            return redirect(sharding.url(game_id, url_for("dashboard")), code=307)
+
         if "create_game" in request.form:
-            game_mode = request.form["game_mode"]
-            number_player = request.form["number_player"]
+            if arret.en_cours:
+                error = "Le serveur redémarre, réessayez dans quelques instants."
+                return render_template("dashboard.html", pseudo=session["pseudo"], error=error)
+
+            game_mode = request.form.get("game_mode")
+            if game_mode not in MODES:
+                error = "Mode de jeu invalide."
+                return render_template("dashboard.html", pseudo=session["pseudo"], error=error)
+            number_player = nombre_joueurs(request.form.get("number_player"))
+            if number_player is None:
+                error = "Nombre de joueurs invalide."
+                return render_template("dashboard.html", pseudo=session["pseudo"], error=error)
+            round_duration = duree_tour(request.form.get("round_duration"))
+            if round_duration is None:
+                error = "Durée de tour invalide."
+                return render_template("dashboard.html", pseudo=session["pseudo"], error=error)
             game_id = generate_unique_game_id()
+            if game_id is None:
+                error = "Aucun identifiant de partie disponible, réessayez plus tard."
+                return render_template("dashboard.html", pseudo=session["pseudo"], error=error)
             games[game_id] = {
+                "session": uuid.uuid4().hex,  # Unique même quand l'identifiant de partie est réutilisé
                 "mode": game_mode,
                 "players": [session["pseudo"]],
                 "number_player": number_player,
                 "host": session["pseudo"],
                 "status": "waiting",
                 "problems": [],
+                "problem_texts": {},
+                "problem_index": {},
+                "next_problem_id": 1,
                 "resultats": [],
-                "votes": {}
+                "votes": {},
+                "rounds": {},
+                "round_duration": round_duration,
+                "deck": decks.nom_deck(request.form.get("deck"))
             }
+            presence.attendre(game_id, session["pseudo"])
+            etat.modifier(game_id, problemes=True)
 
             session["game_id"] = game_id
             route = "game_room"
@@ -88,6 +134,8 @@ def dashboard():
                 else:                
                     if session["pseudo"] not in games[game_id]["players"]:
                         games[game_id]["players"].append(session["pseudo"])
+                        presence.attendre(game_id, session["pseudo"])
+                        etat.modifier(game_id)
 
                     session["game_id"] = game_id
 
@@ -100,65 +148,124 @@ def dashboard():
             else:
                 error = "L'ID de partie n'existe pas."
                 return render_template("dashboard.html", pseudo=session["pseudo"], error=error)
+
+        elif "spectate_game" in request.form:
+            game_id = request.form["game_id"]
+
+            if game_id not in games:
+                error = "L'ID de partie n'existe pas."
+                return render_template("dashboard.html", pseudo=session["pseudo"], error=error)
+            return redirect(url_for("spectate", game_id=game_id))
         
     return render_template("dashboard.html", pseudo=session["pseudo"])
 
 
+@app.route("/lobby")
+def lobby():
+    if "pseudo" not in session:
+        return redirect(url_for("signup"))
+
+    filtres = {
+        "status": request.args.get("status") or None,
+        "mode": request.args.get("mode") or None,
+        "libre": request.args.get("libre") == "1"
+    }
+    return render_template("lobby.html", pseudo=session["pseudo"], games=salon.rechercher(**filtres), filtres=filtres)
+
+
+@socketio.on("join_lobby")
+@ratelimit.limite("join_lobby")
+def handle_join_lobby(data=None):
+    # Les différences du salon sont envoyées groupées par la tâche du salon
+    join_room(salon.ROOM)
+    salon.demarrer()
+
+
 
 ## - Game Room - ##
 
 @socketio.on("start_game")
+@ratelimit.limite("start_game")
 def handle_start_game(data):
     game_id = data["game_id"]
 
-    if session["pseudo"] == games[game_id]["host"]: 
+    if identite.pseudo(request.sid) == games[game_id]["host"]: 
         games[game_id]["status"] = "active"
         emit("start_game", {"game_id": game_id}, room=game_id)
+        etat.modifier(game_id)
 
 
 @socketio.on("select_problem")
+@ratelimit.limite("select_problem")
 def handle_select_problem(data):
     game_id = data["game_id"]
     problem = data["problem"]
 
+    if problem not in games[game_id]["problem_texts"]:
+        return
+
+    tour = ouvrir_tour(game_id, problem)
     games[game_id]["current_problem"] = problem 
 
     # Diffuse pour tous les joueurs
-    emit("problem_selected", {"problem": problem}, room=game_id) 
+    emit("problem_selected", {"problem": problem, "round": tour["id"]}, room=game_id) 
+    etat.modifier(game_id)
 
 @socketio.on("start_vote")
+@ratelimit.limite("start_vote")
 def handle_start_vote(data):
     game_id = data["game_id"]
     problem = data["problem"]
-    
-    games[game_id]["votes"][problem] = {} # Initialiser les votes pour le problème
-    
-    emit("vote_started", {"problem": problem}, room=game_id) # Notifier tous les joueurs pour démarrer le vote
+
+    if problem not in games[game_id]["problem_texts"] or games[game_id]["rounds"].get(problem, {}).get("etat") == "conclu":
+        return
+
+    nouveau_tour(game_id, problem) # Réinitialise les votes et notifie tous les joueurs
 
 @socketio.on("cast_vote")
+@ratelimit.limite("cast_vote")
 def handle_cast_vote(data):
     game_id = data["game_id"]
     problem = data["problem"]
     vote = data["vote"]
-    pseudo = data["pseudo"]
+    pseudo = identite.pseudo(request.sid)
+
+    if pseudo not in games[game_id]["players"]:
+        return
 
-    # Vérifie si le vote pour ce problème est déjà conclu
-    if problem in games[game_id].get("concluded_votes", {}):
+    # Ignore les votes d'un tour déjà dévoilé ou d'un problème conclu
+    tour = games[game_id]["rounds"].get(problem)
+    if tour is None or tour["etat"] != "ouvert" or data.get("round") != tour["id"]:
         return  
 
+    # Le vote est le code de la carte dans le jeu de la partie
+    if not decks.code_valide(decks.deck(games[game_id]["deck"]), vote):
+        return
+
     # Enregistre le vote pour le joueur et le problème
     games[game_id]["votes"][problem][pseudo] = vote
 
     # Notifie tous les joueurs des votes en cours 
-    emit("update_votes", {"problem": problem, "votes": games[game_id]["votes"][problem]}, room=game_id)
+    diffusion.diffuser("update_votes", {"problem": problem, "votes": games[game_id]["votes"][problem]}, game_id, cle=problem)
+    etat.modifier(game_id)
+
+    # Avec un minuteur, le tour se termine dès que tous les joueurs ont voté
+    game = games[game_id]
+    if game.get("round_duration") and set(game["players"]) <= game["votes"][problem].keys():
+        devoiler(game_id, problem)
 
 
 @socketio.on("join_room")
+@ratelimit.limite("join_room")
 def handle_join(data):
     game_id = data["game_id"]
-    pseudo = data["pseudo"]
+    pseudo = identite.pseudo(request.sid)
 
-    if game_id not in games:
+    if not sharding.est_local(game_id):
+        emit("redirect_shard", {"url": sharding.url(game_id, url_for("game_room", game_id=game_id))}, room=request.sid)
+        return
+
+    if game_id not in games or pseudo is None:
         emit("error", {"message": "La partie n'existe pas."}, room=request.sid)
         return
     
@@ -172,36 +279,183 @@ def handle_join(data):
 
     if pseudo not in games[game_id]["players"]:
         games[game_id]["players"].append(pseudo)
+        etat.modifier(game_id)
     
     join_room(game_id)
+    presence.connecter(request.sid, game_id, pseudo)
+    presence.demarrer()
 
     # Prépare les données pour la partie
     game_data = {
         "status": games[game_id]["status"],
         "current_problem": games[game_id].get("current_problem", None),
-        "problems": games[game_id]["problems"],
+        "problems": [{"id": problem, "text": games[game_id]["problem_texts"][problem]} for problem in games[game_id]["problems"]],
         "votes": games[game_id]["votes"],
-        "concluded_votes": games[game_id].get("concluded_votes", {})
+        "rounds": {problem: tour["id"] for problem, tour in games[game_id]["rounds"].items()},
+        "concluded_votes": games[game_id].get("concluded_votes", {}),
+        "suggestions": games[game_id].get("suggestions", {})
     }
 
-    # Envoie l'état actuel de la partie et les problèmes/votes au client
-    emit("update_players", {"players": games[game_id]["players"], "host": games[game_id]["host"]}, room=game_id)
+    # Envoie l'état actuel de la partie au client, la liste des joueurs part avec le prochain envoi groupé
     emit("game_state", game_data, room=request.sid)
 
 
+@socketio.on("connect")
+def handle_connect(auth=None):
+    # Le pseudo de la session est résolu une fois ici, les événements suivants le lisent par sid
+    identite.connecter(request.sid, session.get("pseudo"))
+
+
+@socketio.on("disconnect")
+def handle_disconnect():
+    # Le joueur reste dans la partie jusqu'à la fin du délai de grâce
+    presence.deconnecter(request.sid)
+    identite.deconnecter(request.sid)
+
+
 @socketio.on("add_problem")
+@ratelimit.limite("add_problem")
 def handle_add_problem(data):
     game_id = data["game_id"]
     problem = data["problem"]
-    games[game_id]["problems"].append(problem)
-    games[game_id]["votes"][problem] = {}
-    emit("new_problem", {"problem": problem}, room=game_id)
+
+    if not lot_valide([problem]):
+        emit("error", {"message": "Problème invalide."}, room=request.sid)
+        return
+    if problem in games[game_id]["problem_index"]:
+        emit("error", {"message": "Ce problème existe déjà."}, room=request.sid)
+        return
+
+    ajoute, = ajouter_problemes(game_id, [problem])
+    emit("new_problem", ajoute, room=game_id)
+    etat.modifier(game_id, problemes=True)
+
+
+## Opérations groupées sur les problèmes : un seul envoi pour tout le lot
+
+def ids_valides(problems):
+    return isinstance(problems, list) and all(isinstance(problem, int) and not isinstance(problem, bool) for problem in problems)
+
+
+def texte_valide(problem):
+    return isinstance(problem, str) and bool(problem.strip())
+
+
+def lot_valide(problems):
+    return (isinstance(problems, list) and len(problems) <= app.config["PROBLEM_BATCH_MAX"] and all(texte_valide(problem) for problem in problems))
+
+
+def creer_probleme(game, text):
+    # Les événements référencent le problème par cet identifiant, le texte n'est envoyé qu'une fois
+    problem = game["next_problem_id"]
+    game["next_problem_id"] += 1
+    game["problem_texts"][problem] = text
+    game["problem_index"][text] = problem
+    game["problems"].append(problem)
+    game["votes"][problem] = {}
+    return problem
+
+
+def ajouter_problemes(game_id, texts):
+    game = games[game_id]
+    ajoutes = []
+    for text in texts:
+        if text in game["problem_index"]:
+            continue
+        ajoutes.append({"id": creer_probleme(game, text), "text": text})
+    for ajoute, suggestion in zip(ajoutes, annoter(game_id, [ajoute["id"] for ajoute in ajoutes])):
+        if suggestion is not None:
+            ajoute["suggestion"] = suggestion
+    return ajoutes
+
+
+def annoter(game_id, problems):
+    # Estimation suggérée d'après les problèmes semblables déjà conclus, en une seule requête pour tout le lot
+    game = games[game_id]
+    resultats = suggestions.suggerer([game["problem_texts"][problem] for problem in problems])
+    for problem, suggestion in zip(problems, resultats):
+        if suggestion is not None:
+            game.setdefault("suggestions", {})[problem] = suggestion
+    return resultats
+
+
+@socketio.on("add_problems")
+@ratelimit.limite("add_problems")
+def handle_add_problems(data):
+    game_id = data["game_id"]
+    problems = data["problems"]
+
+    if game_id not in games or not lot_valide(problems):
+        emit("error", {"message": "Liste de problèmes invalide."}, room=request.sid)
+        return
+
+    ajoutes = ajouter_problemes(game_id, problems)
+    if ajoutes:
+        emit("problems_added", {"problems": ajoutes}, room=game_id)
+        etat.modifier(game_id, problemes=True)
+
+
+@socketio.on("reorder_problems")
+@ratelimit.limite("reorder_problems")
+def handle_reorder_problems(data):
+    game_id = data["game_id"]
+    order = data["problems"]
+
+    if game_id not in games or identite.pseudo(request.sid) != games[game_id]["host"]:
+        return
+
+    # Le nouvel ordre doit contenir exactement les problèmes existants
+    game = games[game_id]
+    if not ids_valides(order) or len(order) != len(game["problems"]) or set(order) != game["problem_texts"].keys():
+        emit("error", {"message": "Ordre des problèmes invalide."}, room=request.sid)
+        return
+
+    game["problems"] = list(order)
+    emit("problems_updated", {"problems": game["problems"]}, room=game_id)
+    etat.modifier(game_id, problemes=True)
+
+
+@socketio.on("remove_problems")
+@ratelimit.limite("remove_problems")
+def handle_remove_problems(data):
+    game_id = data["game_id"]
+    problems = data["problems"]
+
+    if game_id not in games or identite.pseudo(request.sid) != games[game_id]["host"]:
+        return
+    if not ids_valides(problems):
+        emit("error", {"message": "Liste de problèmes invalide."}, room=request.sid)
+        return
+
+    game = games[game_id]
+    retires = game["problem_texts"].keys() & set(problems)
+    if not retires:
+        return
+
+    game["problems"] = [problem for problem in game["problems"] if problem not in retires]
+    for problem in retires:
+        del game["problem_index"][game["problem_texts"].pop(problem)]
+        game["votes"].pop(problem, None)
+        game["rounds"].pop(problem, None)
+        game.get("concluded_votes", {}).pop(problem, None)
+        game.get("difficulte", {}).pop(problem, None)
+        game.get("results", {}).pop(problem, None)
+        game.get("premiers_votes", {}).pop(problem, None)
+        game.get("suggestions", {}).pop(problem, None)
+
+    if game.get("current_problem") in retires:
+        del game["current_problem"]
+        scheduler.annuler(game.pop("minuteur", None))
+
+    emit("problems_updated", {"problems": game["problems"]}, room=game_id)
+    etat.modifier(game_id, problemes=True)
 
 
 @socketio.on("end_game")
+@ratelimit.limite("end_game")
 def handle_end_game(data):
     game_id = data["game_id"]
-    pseudo = session.get("pseudo")
+    pseudo = identite.pseudo(request.sid)
 
     if game_id not in games:
         emit("error", {"message": "La partie n'existe pas ou a déjà été terminée."}, room=request.sid)
@@ -209,7 +463,9 @@ def handle_end_game(data):
 
     if games[game_id]["host"] == pseudo:
         emit("game_ended", {"message": "La partie a été terminée par l'hôte."}, room=game_id)
+        scheduler.annuler(games[game_id].get("minuteur"))
         del games[game_id]
+        etat.modifier(game_id)
 
 
 
@@ -218,19 +474,14 @@ def handle_end_game(data):
 @app.route("/game_room/<game_id>")
 def game_room(game_id):
     
+    if not sharding.est_local(game_id):
+        return redirect(sharding.url(game_id, url_for("game_room", game_id=game_id)))
+
     if game_id not in games or session["pseudo"] not in games[game_id]["players"]:
         return redirect(url_for("dashboard"))
 
     players = games[game_id]["players"]
     mode = games[game_id]["mode"]
-
-    mode_labels = {
-        "strict": "Strict (Unanimité)",
-        "moyenne": "Moyenne",
-        "mediane": "Médiane",
-        "majorite_absolue": "Majorité absolue",
-        "majorite_relative": "Majorité relative",
-    }
     resultats = games[game_id].get("resultats", {})
 
     return render_template("game_room.html", 
@@ -238,34 +489,173 @@ def game_room(game_id):
                            pseudo=session["pseudo"], 
                            host=games[game_id]["host"], 
                            mode=mode, 
-                           mode_label=mode_labels[mode], 
+                           mode_label=MODES[mode], 
                            players=players,
+                           deck=decks.deck(games[game_id]["deck"]),
                            results=resultats)
 
 
+## Tours de vote
+# Chaque problème suit : "ouvert" (votes acceptés) -> "devoile" -> "conclu" ou nouveau tour "ouvert".
+# Le numéro du tour remplace le compteur envoyé par le client.
+
+def ouvrir_tour(game_id, problem):
+    # Ouvre le premier tour si besoin, sinon conserve le tour en cours
+    game = games[game_id]
+    tour = game["rounds"].get(problem)
+    if tour is None:
+        tour = nouveau_tour(game_id, problem)
+    elif tour["etat"] == "ouvert" and game.get("current_problem") != problem:
+        # Un seul minuteur par partie, celui du problème sélectionné : le tour repris repart avec une échéance complète
+        armer_minuteur(game_id, problem, tour["id"])
+    return tour
+
+
+def nouveau_tour(game_id, problem):
+    game = games[game_id]
+    precedent = game["rounds"].get(problem)
+    tour = {"id": precedent["id"] + 1 if precedent else 1, "etat": "ouvert"}
+    game["rounds"][problem] = tour
+    game["votes"][problem] = {}
+
+    # Les votes en attente du tour précédent partent avant l'annonce du nouveau tour
+    diffusion.vider(game_id)
+    socketio.emit("vote_started", {"problem": problem, "round": tour["id"]}, room=game_id)
+    etat.modifier(game_id)
+    armer_minuteur(game_id, problem, tour["id"])
+    return tour
+
+
+## Spectateurs : hors capacité, résumés à débit limité dans une sous-room
+
+@app.route("/spectate/<game_id>")
+def spectate(game_id):
+    if not sharding.est_local(game_id):
+        return redirect(sharding.url(game_id, url_for("spectate", game_id=game_id)))
+
+    if "pseudo" not in session or game_id not in games:
+        return redirect(url_for("dashboard"))
+
+    return render_template("spectator.html",
+                           game_id=game_id,
+                           host=games[game_id]["host"],
+                           mode=games[game_id]["mode"])
+
+
+@socketio.on("join_spectator")
+@ratelimit.limite("join_spectator")
+def handle_join_spectator(data):
+    game_id = data["game_id"]
+
+    if not sharding.est_local(game_id):
+        emit("redirect_shard", {"url": sharding.url(game_id, url_for("spectate", game_id=game_id))}, room=request.sid)
+        return
+
+    if game_id not in games:
+        emit("error", {"message": "La partie n'existe pas."}, room=request.sid)
+        return
+
+    join_room(spectateurs.room(game_id))
+    spectateurs.demarrer()
+
+    donnees = spectateurs.resume(game_id)
+    donnees["problems"] = spectateurs.problemes(game_id)
+    emit("room_summary", donnees, room=request.sid)
+
+
+# Minuteur de tour : une échéance dans l'échéancier commun, pas une tâche par partie
+def armer_minuteur(game_id, problem, round_id):
+    game = games[game_id]
+    scheduler.annuler(game.pop("minuteur", None))
+
+    duree = game.get("round_duration", 0)
+    if not duree:
+        return
+
+    game["minuteur"] = scheduler.planifier(duree, fin_du_tour, game_id, problem, round_id)
+    scheduler.demarrer()
+    socketio.emit("round_timer", {"problem": problem, "round": round_id, "duration": duree}, room=game_id)
+
+
+def reprendre_minuteur(game_id):
+    # Partie rechargée ou transférée : le tour ouvert repart avec une échéance complète
+    problem = games[game_id].get("current_problem")
+    tour = games[game_id]["rounds"].get(problem)
+    if tour is not None and tour["etat"] == "ouvert":
+        armer_minuteur(game_id, problem, tour["id"])
+
+
+def fin_du_tour(game_id, problem, round_id):
+    game = games.get(game_id)
+    if game is None:
+        return
+
+    tour = game["rounds"].get(problem)
+    if tour is None or tour["id"] != round_id or tour["etat"] != "ouvert":
+        return
+
+    game.pop("minuteur", None)
+    devoiler(game_id, problem)
+
+
 @socketio.on("devoiler_vote")
+@ratelimit.limite("devoiler_vote")
 def devoiler_vote(data):
     game_id = data["game_id"]
     problem = data["problem"]
-    compteur = data["compteur"]
 
     if game_id not in games or problem not in games[game_id]["votes"]:
         emit("error", {"message": "Partie ou problème invalide."}, room=request.sid)
         return
 
-    votes = games[game_id]["votes"].get(problem, {})
+    # Un second clic sur le même tour n'a aucun effet
+    tour = games[game_id]["rounds"].get(problem)
+    if tour is None or tour["etat"] != "ouvert" or data.get("round") != tour["id"]:
+        return
+
+    devoiler(game_id, problem)
+
+
+def devoiler(game_id, problem):
+    tour = games[game_id]["rounds"][problem]
+    tour["etat"] = "devoile"
+    scheduler.annuler(games[game_id].pop("minuteur", None))
+    diffusion.vider(game_id)  # Les votes en attente partent avant le résultat
+    votes = presence.votes_actifs(game_id, games[game_id]["votes"].get(problem, {}))
+    historique.enregistrer(game_id, problem, tour["id"], votes)
+    analytique.tour_devoile(game_id, problem, votes)
+
+    # Premier tour : unanimité exigée, ensuite la règle du mode de jeu s'applique
+    devoiler_selon_mode(game_id, problem, tour["id"])
+
+    game = games.get(game_id)
+    if game is None:
+        return
+
+    if problem in game.get("concluded_votes", {}):
+        tour["etat"] = "conclu"
+        analytique.conclure(game_id, problem, tour["id"])
+        suggestions.ajouter(game["problem_texts"][problem], game["concluded_votes"][problem])
+        etat.modifier(game_id)
+    else:
+        nouveau_tour(game_id, problem)
+
+
+def devoiler_selon_mode(game_id, problem, round_id):
+    votes = presence.votes_actifs(game_id, games[game_id]["votes"].get(problem, {}))
     players = games[game_id]["players"]
     mode = games[game_id]["mode"]
+    jeu = decks.deck(games[game_id]["deck"])
 
 
     # Si tous les votes sont "café"
-    if all(vote == "cafe" for vote in votes.values()) and len(votes) == len(players):
+    if all(vote == jeu["cafe"] for vote in votes.values()) and len(votes) == len(players):
         print("Tous les joueurs ont voté café, sauvegarde automatique...", flush=True)
         
         # Sauvegarder automatiquement la partie
-        handle_save_resultats({"game_id": game_id})
+        sauvegarder_resultats(game_id)
 
-        emit("unanimous_vote", {
+        socketio.emit("unanimous_vote", {
             "problem": problem,
             "result": "cafe",
             "votes": votes
@@ -276,9 +666,9 @@ def devoiler_vote(data):
     if "results" not in games[game_id]:
         games[game_id]["results"] = {} 
 
-    if compteur == 1 or mode == "strict":
+    if round_id == 1 or mode == "strict":
         if len(set(votes.values())) == 1 and len(votes) == len(players):
-            unanimous_vote = list(votes.values())[0]
+            unanimous_vote = jeu["resultats"][next(iter(votes.values()))]
             games[game_id].setdefault("concluded_votes", {})[problem] = unanimous_vote
             games[game_id].setdefault("results", {})[problem] = unanimous_vote
             socketio.emit("unanimous_vote", {
@@ -291,23 +681,23 @@ def devoiler_vote(data):
         else:
             socketio.emit("revote", {
                 "problem": problem,
-                "message": f"Re votez pour le problème {problem}",
+                "message": f"Re votez pour le problème {games[game_id]['problem_texts'][problem]}",
                 "votes": votes
             }, room=game_id)
     else:
         if mode == "moyenne":
-            devoiler_vote_moyenne(game_id, problem, votes)
+            devoiler_vote_moyenne(game_id, problem, votes, jeu)
         elif mode == "mediane":
-            devoiler_vote_mediane(game_id, problem, votes)
+            devoiler_vote_mediane(game_id, problem, votes, jeu)
         elif mode == "majorite_absolue":
-            devoiler_vote_majorite_absolue(game_id, problem, votes)
+            devoiler_vote_majorite_absolue(game_id, problem, votes, jeu)
         elif mode == "majorite_relative":
-            devoiler_vote_majorite_relative(game_id, problem, votes)
+            devoiler_vote_majorite_relative(game_id, problem, votes, jeu)
 
 
-def devoiler_vote_moyenne(game_id, problem, votes):
+def devoiler_vote_moyenne(game_id, problem, votes, jeu):
 
-    valid_votes = [vote for vote in votes.values() if isinstance(vote, (int, float))]
+    valid_votes = decks.valeurs_numeriques(jeu, votes.values())
     
     if valid_votes:
         moyenne_vote = sum(valid_votes) / len(valid_votes)
@@ -327,9 +717,9 @@ def devoiler_vote_moyenne(game_id, problem, votes):
         }, room=game_id)
 
 
-def devoiler_vote_mediane(game_id, problem, votes):
+def devoiler_vote_mediane(game_id, problem, votes, jeu):
 
-    valid_votes = [vote for vote in votes.values() if isinstance(vote, (int, float))]
+    valid_votes = decks.valeurs_numeriques(jeu, votes.values())
     if valid_votes:
         sorted_votes = sorted(valid_votes)
         n = len(sorted_votes)
@@ -351,12 +741,13 @@ def devoiler_vote_mediane(game_id, problem, votes):
             "message": "Aucun vote valide pour calculer la médiane."
         }, room=game_id)
 
-def devoiler_vote_majorite_absolue(game_id, problem, votes):
+def devoiler_vote_majorite_absolue(game_id, problem, votes, jeu):
     if votes:
-        vote_counts = {vote: list(votes.values()).count(vote) for vote in set(votes.values())}
-        majorite_vote = max(vote_counts, key=vote_counts.get)
+        vote_counts = Counter(votes.values())
+        majorite_code, majorite_count = vote_counts.most_common(1)[0]
         
-        if vote_counts[majorite_vote] > len(votes) / 2:
+        if majorite_count > len(votes) / 2:
+            majorite_vote = jeu["resultats"][majorite_code]
             games[game_id].setdefault("concluded_votes", {})[problem] = majorite_vote
             games[game_id].setdefault("results", {})[problem] = majorite_vote
             socketio.emit("majority_vote", {
@@ -374,14 +765,14 @@ def devoiler_vote_majorite_absolue(game_id, problem, votes):
             }, room=game_id)
 
 
-def devoiler_vote_majorite_relative(game_id, problem, votes):
+def devoiler_vote_majorite_relative(game_id, problem, votes, jeu):
     if votes:
-        vote_counts = {vote: list(votes.values()).count(vote) for vote in set(votes.values())}
+        vote_counts = Counter(votes.values())
         max_count = max(vote_counts.values())
         vote_max_nb = [vote for vote, count in vote_counts.items() if count == max_count]
 
         if len(vote_max_nb) == 1:
-            majorite_relative_vote = vote_max_nb[0]
+            majorite_relative_vote = jeu["resultats"][vote_max_nb[0]]
             games[game_id].setdefault("concluded_votes", {})[problem] = majorite_relative_vote
             games[game_id].setdefault("results", {})[problem] = majorite_relative_vote
             socketio.emit("relative_majority_vote", {
@@ -404,31 +795,117 @@ def devoiler_vote_majorite_relative(game_id, problem, votes):
 #JSON 
 
 
+# Nombre de joueurs d'un backlog qui ne le précise pas : le maximum proposé par le tableau de bord
+NOMBRE_JOUEURS_DEFAUT = 6
+
+
+def nombre_joueurs(valeur):
+    # Entier positif, éventuellement écrit en chaîne, valeur par défaut si absent ; None si invalide
+    if valeur in (None, ""):
+        return NOMBRE_JOUEURS_DEFAUT
+    if isinstance(valeur, bool) or not isinstance(valeur, (int, str)):
+        return None
+    if isinstance(valeur, str):
+        if not re.fullmatch(r"[0-9]+", valeur):
+            return None
+        valeur = int(valeur)
+    return valeur if valeur > 0 else None
+
+
+# Durées de tour proposées par le tableau de bord (secondes), 0 : sans minuteur
+DUREES_TOUR = (0, 30, 60, 120, 300)
+
+
+def duree_tour(valeur):
+    # Durée proposée, en entier ou en chaîne, 0 si absente ; None sinon
+    if valeur in (None, ""):
+        return 0
+    if isinstance(valeur, str) and re.fullmatch(r"[0-9]+", valeur):
+        valeur = int(valeur)
+    if isinstance(valeur, bool) or valeur not in DUREES_TOUR:
+        return None
+    return int(valeur)
+
+
+def erreur_backlog(backlog):
+    if not isinstance(backlog, dict):
+        return "Le fichier doit contenir un objet JSON."
+    game_id = backlog.get("partie_id")
+    if game_id is not None and (isinstance(game_id, bool) or not re.fullmatch(r"[0-9]+", str(game_id))):
+        return "Identifiant de partie invalide."
+    if nombre_joueurs(backlog.get("number_player")) is None:
+        return "Nombre de joueurs invalide."
+    if duree_tour(backlog.get("duree_tour")) is None:
+        return "Durée de tour invalide."
+    if not isinstance(backlog.get("mode_de_jeu"), str) or backlog["mode_de_jeu"] not in MODES:
+        return "Mode de jeu invalide."
+    if not isinstance(backlog.get("deck"), (str, type(None))):
+        return "Jeu de cartes invalide."
+    # Un backlog n'est pas limité à la taille d'un lot : il est importé en une fois, comme avant
+    resultats = backlog.get("resultats", [])
+    if not isinstance(resultats, list) or not all(isinstance(entree, dict) and texte_valide(entree.get("probleme")) for entree in resultats):
+        return "Liste des résultats invalide."
+    return None
+
+
 @socketio.on("upload_backlog")
+@ratelimit.limite("upload_backlog")
 def handle_upload_backlog(data):
     file_data = data["file_data"]  #Contenu du JSON 
+    pseudo = identite.pseudo(request.sid)
+    if arret.en_cours:
+        emit("error", {"message": "Le serveur redémarre, réessayez dans quelques instants."})
+        return
+    if pseudo is None:
+        emit("error", {"message": "Veuillez vous connecter."})
+        return
     try:
         #Charger le JSON 
         backlog = json.loads(file_data)
 
-        game_id = backlog.get("partie_id")
+        # Tout est vérifié avant de créer la partie : une partie à moitié créée casserait le salon et l'API
+        erreur = erreur_backlog(backlog)
+        if erreur:
+            emit("error", {"message": erreur})
+            return
+
+        # L'identifiant du fichier est repris s'il est libre et rattaché à ce worker
+        game_id = str(backlog["partie_id"]) if backlog.get("partie_id") is not None else None
+        if not game_id or game_id in games or not sharding.est_local(game_id):
+            game_id = generate_unique_game_id()
+        if game_id is None:
+            emit("error", {"message": "Aucun identifiant de partie disponible, réessayez plus tard."})
+            return
         mode_de_jeu = backlog.get("mode_de_jeu")
         resultats = backlog.get("resultats", [])
-        number_player = backlog.get("number_player")
+        number_player = nombre_joueurs(backlog.get("number_player"))
 
         games[game_id] = {
+            "session": uuid.uuid4().hex,
             "mode": mode_de_jeu,
-            "players": [session["pseudo"]],
+            "players": [pseudo],
             "number_player": number_player,
-            "host": session["pseudo"],
+            "host": pseudo,
             "status": "waiting",
-            "problems": [entry["probleme"] for entry in resultats],
-            "difficulte": {entry["probleme"]: entry["difficulte"] for entry in resultats},  # Stocke les difficultés
+            "problems": [],
+            "problem_texts": {},
+            "problem_index": {},
+            "next_problem_id": 1,
+            "difficulte": {},  # Stocke les difficultés
             "votes": {},
-            "results": resultats
+            "rounds": {},
+            "results": {},
+            "round_duration": duree_tour(backlog.get("duree_tour")),
+            "deck": decks.nom_deck(backlog.get("deck"))
         }
+        presence.attendre(game_id, pseudo)
+        etat.modifier(game_id, problemes=True)
         for entry in resultats:
-            games[game_id]["votes"][entry["probleme"]] = {}
+            problem = creer_probleme(games[game_id], entry["probleme"])
+            games[game_id]["difficulte"][problem] = entry.get("difficulte")
+            if entry.get("difficulte") is not None:
+                games[game_id]["results"][problem] = entry["difficulte"]
+        annoter(game_id, [problem for problem, difficulte in games[game_id]["difficulte"].items() if difficulte is None])
     
         emit("redirect_to_game_room", {"game_id": game_id})
     except Exception as e:
@@ -436,6 +913,7 @@ def handle_upload_backlog(data):
 
 
 @socketio.on("save_resultats")
+@ratelimit.limite("save_resultats")
 def handle_save_resultats(data):
     game_id = data["game_id"]
 
@@ -443,18 +921,23 @@ def handle_save_resultats(data):
         emit("error", {"message": "La partie n'existe pas."}, room=request.sid)
         return
 
-    resultats = games[game_id].get("resultats", {})
+    sauvegarder_resultats(game_id)
+
+
+def sauvegarder_resultats(game_id):
     problemes = games[game_id]["problems"]
+    textes = games[game_id]["problem_texts"]
     mode_de_jeu = games[game_id]["mode"] 
     max_player = games[game_id]["number_player"]
-    resultats = games[game_id]["results"]
+    resultats = games[game_id].get("results", {})
     # Inclure le mode de jeu et les résultats
     fichier = {
         "partie_id": game_id,
         "mode_de_jeu": mode_de_jeu,
         "number_player": max_player,
+        "deck": games[game_id]["deck"],
         "resultats": [
-            {"probleme": probleme, "difficulte": resultats.get(probleme)}
+            {"probleme": textes[probleme], "difficulte": resultats.get(probleme)}
             for probleme in problemes
         ]
     }
@@ -462,13 +945,16 @@ def handle_save_resultats(data):
     file_name = f"{game_id}_resultats.json"
     with open(file_name, "w") as file:
         json.dump(fichier, file, indent=4)
+    historique.vider()
 
-    emit("resultats_saved", {
+    socketio.emit("resultats_saved", {
         "message": "Tous les joueurs ont voté café. Fin de la partie !",
         "file_name": file_name
     }, room=game_id)
 
+    scheduler.annuler(games[game_id].get("minuteur"))
     del games[game_id]
+    etat.modifier(game_id)
     return
 
 
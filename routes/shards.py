@@ -0,0 +1,134 @@
+import urllib.error
+from flask import request, jsonify, url_for
+from extensions import app, socketio, games
+from services import sharding, persistance, presence, scheduler, spectateurs, etat, arret, historique, analytique, suggestions
+from routes.routes import reprendre_minuteur
+
+
+## Répartition des parties entre workers : changement de topologie et transfert de parties
+
+# Parties en cours d'envoi, pour ne pas lancer deux transferts de la même partie
+_en_transfert = set()
+
+@app.route("/shard/topology", methods=["POST"])
+def shard_topology():
+    if not sharding.autorise(request):
+        return jsonify({"error": "Accès refusé."}), 403
+
+    sharding.configurer(request.get_json()["shards"])
+    return jsonify({"moved": reequilibrer()})
+
+
+@app.route("/shard/import", methods=["POST"])
+def shard_import():
+    if not sharding.autorise(request):
+        return jsonify({"error": "Accès refusé."}), 403
+
+    donnees = request.get_json()
+    game = persistance.importer(donnees["game"])
+
+    # Renvoi d'une partie déjà reçue (réponse perdue, partie modifiée pendant l'envoi) : la copie reçue la remplace
+    existante = games.get(donnees["game_id"])
+    if existante is not None:
+        if existante.get("session") != game["session"]:
+            return jsonify({"error": "Une autre partie porte cet identifiant."}), 409
+        scheduler.annuler(existante.get("minuteur"))
+    accueillir(donnees["game_id"], game)
+    return jsonify({"game_id": donnees["game_id"]})
+
+
+@app.route("/shard/drain", methods=["POST"])
+def shard_drain():
+    if not sharding.autorise(request):
+        return jsonify({"error": "Accès refusé."}), 403
+
+    # Avec une cible, les parties passent au nouveau worker ; sinon elles sont sauvegardées pour le redémarrage
+    arret.commencer()
+    cible = (request.get_json(silent=True) or {}).get("target")
+    if cible:
+        return jsonify({"moved": [game_id for game_id in list(games) if transferer(game_id, cible)]})
+    return jsonify({"saved": arret.sauvegarder()})
+
+
+def accueillir(game_id, game):
+    games[game_id] = game
+
+    # Les joueurs ont le délai de grâce pour se reconnecter sur ce worker
+    for pseudo in game["players"]:
+        presence.attendre(game_id, pseudo)
+    presence.demarrer()
+    reprendre_minuteur(game_id)
+    etat.modifier(game_id, problemes=True)
+
+
+def restaurer():
+    # Parties et statistiques sauvegardées par le worker précédent lors de son arrêt
+    analytique.charger()
+    suggestions.demarrer()
+    for game_id, game in arret.charger().items():
+        accueillir(game_id, game)
+
+    # Topologie changée pendant le redémarrage : les parties d'autres workers leur sont envoyées,
+    # en tâche de fond pour ne pas retarder le démarrage (elles restent servies ici en cas d'échec)
+    if any(not sharding.est_local(game_id) for game_id in games):
+        socketio.start_background_task(reequilibrer)
+
+
+def arreter():
+    # Arrêt du processus : les clients se reconnectent seuls au worker suivant, qui recharge l'instantané
+    arret.commencer()
+    historique.vider()
+    analytique.sauvegarder()
+    app.logger.info("%s partie(s) sauvegardée(s) avant l'arrêt", arret.sauvegarder())
+
+
+def transferer(game_id, cible):
+    if game_id in _en_transfert:
+        return False
+    _en_transfert.add(game_id)
+    try:
+        return _transferer(game_id, cible)
+    finally:
+        _en_transfert.discard(game_id)
+
+
+def _transferer(game_id, cible):
+    # La partie reste jouable ici pendant l'envoi : elle est renvoyée si elle a changé entre-temps,
+    # et n'est supprimée qu'une fois la dernière version confirmée par la cible
+    for _ in range(app.config["SHARD_TRANSFER_ATTEMPTS"]):
+        if game_id not in games:
+            return False
+        version = etat.versions.get(game_id)
+        try:
+            transferee = sharding.envoyer(cible, "/shard/import", {
+                "game_id": game_id,
+                "game": persistance.exporter(games[game_id])
+            })
+        except urllib.error.HTTPError:
+            app.logger.exception("Transfert de la partie %s refusé par %s", game_id, cible)
+            return False
+        except OSError:
+            # Sans réponse, l'import a pu aboutir : le renvoi est sans risque et le confirme
+            app.logger.warning("Transfert de la partie %s vers %s sans réponse, nouvel essai", game_id, cible)
+            continue
+        if not transferee:
+            return False
+        if game_id in games and etat.versions.get(game_id) == version:
+            break
+    else:
+        app.logger.error("Transfert de la partie %s vers %s abandonné, elle reste sur ce worker", game_id, cible)
+        return False
+
+    adresse = cible.rstrip("/")
+    socketio.emit("redirect_shard", {"url": adresse + url_for("game_room", game_id=game_id)}, room=game_id)
+    socketio.emit("redirect_shard", {"url": adresse + url_for("spectate", game_id=game_id)}, room=spectateurs.room(game_id))
+    scheduler.annuler(games[game_id].get("minuteur"))
+    del games[game_id]
+    etat.modifier(game_id)
+    return True
+
+
+def reequilibrer():
+    # Avec le hachage cohérent, seules les parties dont le propriétaire a changé sont déplacées
+    return [game_id for game_id in list(games)
+            if not sharding.est_local(game_id) and transferer(game_id, sharding.proprietaire(game_id))]
@@ -0,0 +1,106 @@
+import json
+import os
+from extensions import app, games
+from services import decks, sharding
+
+
+# Statistiques cumulées par joueur, par équipe (ensemble des joueurs d'une partie) et par mode de jeu.
+# Chaque tour dévoilé et chaque conclusion ajoute un nombre constant de valeurs par portée.
+PORTEES = ("user", "team", "mode")
+stats = {portee: {} for portee in PORTEES}
+
+
+def _compteurs(portee, cle):
+    return stats[portee].setdefault(cle, {
+        "votes": 0, "cafe": 0,
+        "ecarts": 0, "somme_ecarts": 0.0, "somme_ecarts_abs": 0.0,
+        "conclusions": 0, "revotes": 0,
+    })
+
+
+def _cles(game):
+    return ("team", ",".join(sorted(game["players"]))), ("mode", game["mode"])
+
+
+def _valeur(jeu, resultat):
+    # Résultat conclu : nombre (moyenne, médiane) ou libellé de carte
+    if isinstance(resultat, (int, float)) and not isinstance(resultat, bool):
+        return resultat
+    code = jeu["index"].get(resultat)
+    return None if code is None else jeu["valeurs"][code]
+
+
+def tour_devoile(game_id, problem, votes):
+    game = games[game_id]
+    jeu = decks.deck(game["deck"])
+    cafes = sum(code == jeu["cafe"] for code in votes.values())
+
+    for pseudo, code in votes.items():
+        compteurs = _compteurs("user", pseudo)
+        compteurs["votes"] += 1
+        compteurs["cafe"] += code == jeu["cafe"]
+    for portee, cle in _cles(game):
+        compteurs = _compteurs(portee, cle)
+        compteurs["votes"] += len(votes)
+        compteurs["cafe"] += cafes
+
+    # Les écarts sont mesurés sur le premier tour, avant que les joueurs ne s'alignent
+    game.setdefault("premiers_votes", {}).setdefault(problem, dict(votes))
+
+
+def conclure(game_id, problem, round_id):
+    game = games[game_id]
+    jeu = decks.deck(game["deck"])
+    finale = _valeur(jeu, game["concluded_votes"][problem])
+    premiers = game.get("premiers_votes", {}).pop(problem, {})
+
+    groupes = _cles(game)
+    for portee, cle in groupes:
+        compteurs = _compteurs(portee, cle)
+        compteurs["conclusions"] += 1
+        compteurs["revotes"] += round_id - 1
+
+    for pseudo, code in premiers.items():
+        joueur = _compteurs("user", pseudo)
+        joueur["conclusions"] += 1
+        joueur["revotes"] += round_id - 1
+
+        valeur = jeu["valeurs"][code]
+        if finale is None or valeur is None:
+            continue
+        ecart = valeur - finale
+        for compteurs in (joueur, *(_compteurs(portee, cle) for portee, cle in groupes)):
+            compteurs["ecarts"] += 1
+            compteurs["somme_ecarts"] += ecart
+            compteurs["somme_ecarts_abs"] += abs(ecart)
+
+
+def resume(compteurs):
+    division = lambda a, b: a / b if b else None
+    return {
+        "votes": compteurs["votes"],
+        "conclusions": compteurs["conclusions"],
+        "cafe_frequency": division(compteurs["cafe"], compteurs["votes"]),
+        "mean_deviation": division(compteurs["somme_ecarts"], compteurs["ecarts"]),
+        "mean_abs_deviation": division(compteurs["somme_ecarts_abs"], compteurs["ecarts"]),
+        "mean_revotes": division(compteurs["revotes"], compteurs["conclusions"]),
+    }
+
+
+def _chemin():
+    return os.path.join(app.instance_path, sharding.par_worker(app.config["ANALYTICS_FILE"]))
+
+
+def sauvegarder():
+    os.makedirs(app.instance_path, exist_ok=True)
+    temporaire = _chemin() + ".tmp"
+    with open(temporaire, "w", encoding="utf-8") as fichier:
+        json.dump(stats, fichier, separators=(",", ":"))
+    os.replace(temporaire, _chemin())
+
+
+def charger():
+    if os.path.isfile(_chemin()):
+        with open(_chemin(), encoding="utf-8") as fichier:
+            for portee, valeurs in json.load(fichier).items():
+                stats[portee].update(valeurs)
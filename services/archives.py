@@ -0,0 +1,77 @@
+import json
+import os
+
+
+# Lecture des fichiers {game_id}_resultats.json écrits par sauvegarder_resultats.
+# Ce module n'importe pas l'application : il est exécuté dans les processus d'import.
+
+SUFFIXE = "_resultats.json"
+
+
+def decouvrir(dossiers):
+    for dossier in dossiers:
+        for racine, _, fichiers in os.walk(dossier):
+            for nom in fichiers:
+                if nom.endswith(SUFFIXE):
+                    yield os.path.realpath(os.path.join(racine, nom))
+
+
+def _difficulte(valeur):
+    # Valeur de carte (nombre ou libellé) ou problème non estimé
+    if valeur is None or isinstance(valeur, str):
+        return valeur
+    if isinstance(valeur, (int, float)) and not isinstance(valeur, bool):
+        return str(valeur)
+    raise ValueError(f"difficulté invalide : {valeur!r}")
+
+
+def _nombre_joueurs(valeur):
+    if valeur in (None, ""):
+        return None
+    if isinstance(valeur, int) and not isinstance(valeur, bool):
+        return valeur
+    if isinstance(valeur, str) and valeur.strip().isdecimal():
+        return int(valeur)
+    raise ValueError(f"number_player invalide : {valeur!r}")
+
+
+def _texte(donnees, cle):
+    # Colonne texte en base : une autre valeur ferait échouer tout le lot à l'insertion
+    valeur = donnees.get(cle)
+    if valeur is not None and not isinstance(valeur, str):
+        raise ValueError(f"{cle} invalide : {valeur!r}")
+    return valeur
+
+
+def valider(donnees):
+    if not isinstance(donnees, dict):
+        raise ValueError("objet JSON attendu")
+    game_id = donnees.get("partie_id")
+    if not isinstance(game_id, (str, int)) or isinstance(game_id, bool) or not str(game_id):
+        raise ValueError("partie_id manquant")
+    resultats = donnees.get("resultats")
+    if not isinstance(resultats, list):
+        raise ValueError("resultats doit être une liste")
+
+    estimations = []
+    for position, entree in enumerate(resultats):
+        if not isinstance(entree, dict) or not isinstance(entree.get("probleme"), str) or not entree["probleme"].strip():
+            raise ValueError(f"résultat {position} invalide")
+        estimations.append((position, entree["probleme"], _difficulte(entree.get("difficulte"))))
+
+    return {
+        "game_id": str(game_id),
+        "mode": _texte(donnees, "mode_de_jeu"),
+        "number_player": _nombre_joueurs(donnees.get("number_player")),
+        "deck": _texte(donnees, "deck"),
+        "estimations": estimations,
+    }
+
+
+def lire(chemin):
+    # Renvoie (chemin, partie, erreur) : une archive invalide n'arrête pas l'import
+    try:
+        with open(chemin, encoding="utf-8") as fichier:
+            return chemin, valider(json.load(fichier)), None
+    except (OSError, ValueError, TypeError) as erreur:
+        return chemin, None, str(erreur)
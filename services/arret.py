@@ -0,0 +1,40 @@
+import json
+import os
+from extensions import app, games
+from services import persistance, sharding
+
+
+# Arrêt en cours : le worker ne crée plus de parties et vide celles qu'il gère
+en_cours = False
+
+
+def commencer():
+    global en_cours
+    en_cours = True
+
+
+def _chemin():
+    # Un instantané par worker : le suivant lancé avec le même SHARD_URL reprend celui-ci
+    return os.path.join(app.instance_path, sharding.par_worker(app.config["DRAIN_SNAPSHOT"]))
+
+
+def sauvegarder():
+    # Instantané compact de toutes les parties, relu au prochain démarrage
+    chemin = _chemin()
+    os.makedirs(os.path.dirname(chemin), exist_ok=True)
+    temporaire = chemin + ".tmp"
+    with open(temporaire, "w", encoding="utf-8") as fichier:
+        json.dump({game_id: persistance.exporter(game) for game_id, game in games.items()}, fichier, separators=(",", ":"))
+    os.replace(temporaire, chemin)
+    return len(games)
+
+
+def charger():
+    # L'instantané est supprimé une fois lu pour ne pas recharger deux fois les mêmes parties
+    chemin = _chemin()
+    if not os.path.isfile(chemin):
+        return {}
+    with open(chemin, encoding="utf-8") as fichier:
+        donnees = json.load(fichier)
+    os.remove(chemin)
+    return {game_id: persistance.importer(game) for game_id, game in donnees.items()}
@@ -0,0 +1,99 @@
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+from flask import request, send_file, abort
+from werkzeug.security import safe_join
+
+try:
+    import brotli
+except ImportError:  # brotli est optionnel, gzip suffit sinon
+    brotli = None
+
+
+EXTENSIONS = (".css", ".js", ".svg")
+DOSSIER_BUILD = "build"
+CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+# chemin d'origine dans static -> chemin avec empreinte dans static/build
+manifest = {}
+
+_dossier_build = None
+
+
+def _ecrire(chemin, contenu):
+    # Écriture atomique : plusieurs workers peuvent construire en même temps
+    temporaire = f"{chemin}.{os.getpid()}.tmp"
+    with open(temporaire, "wb") as fichier:
+        fichier.write(contenu)
+    os.replace(temporaire, chemin)
+
+
+def construire(static_folder):
+    build = os.path.join(static_folder, DOSSIER_BUILD)
+    resultat = {}
+
+    for dossier, sous_dossiers, fichiers in os.walk(static_folder):
+        sous_dossiers[:] = [nom for nom in sous_dossiers if os.path.join(dossier, nom) != build]
+
+        for nom in fichiers:
+            if not nom.endswith(EXTENSIONS):
+                continue
+            source = os.path.join(dossier, nom)
+            with open(source, "rb") as fichier:
+                contenu = fichier.read()
+
+            relatif = os.path.relpath(source, static_folder).replace(os.sep, "/")
+            base, extension = os.path.splitext(relatif)
+            empreinte = hashlib.sha256(contenu).hexdigest()[:12]
+            cible = f"{base}.{empreinte}{extension}"
+            resultat[relatif] = f"{DOSSIER_BUILD}/{cible}"
+
+            chemin = os.path.join(build, cible)
+            if os.path.exists(chemin):
+                continue  # Même empreinte : déjà construit
+            os.makedirs(os.path.dirname(chemin), exist_ok=True)
+            _ecrire(chemin + ".gz", gzip.compress(contenu, compresslevel=9, mtime=0))
+            if brotli is not None:
+                _ecrire(chemin + ".br", brotli.compress(contenu))
+            _ecrire(chemin, contenu)
+
+    os.makedirs(build, exist_ok=True)
+    _ecrire(os.path.join(build, "manifest.json"), json.dumps(resultat, indent=4).encode())
+    return resultat
+
+
+def servir(filename):
+    chemin = safe_join(_dossier_build, filename)
+    if chemin is None or not os.path.isfile(chemin):
+        abort(404)
+
+    mimetype = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+    for extension, encodage in ((".br", "br"), (".gz", "gzip")):
+        if encodage in request.accept_encodings and os.path.isfile(chemin + extension):
+            reponse = send_file(chemin + extension, mimetype=mimetype, conditional=True)
+            reponse.headers["Content-Encoding"] = encodage
+            break
+    else:
+        reponse = send_file(chemin, mimetype=mimetype, conditional=True)
+
+    reponse.headers["Cache-Control"] = CACHE_CONTROL
+    reponse.headers["Vary"] = "Accept-Encoding"
+    return reponse
+
+
+def init_app(app):
+    global _dossier_build
+    if not app.config.get("ASSETS_BUILD", True):
+        return
+
+    manifest.update(construire(app.static_folder))
+    _dossier_build = os.path.join(app.static_folder, DOSSIER_BUILD)
+    app.add_url_rule(f"{app.static_url_path}/{DOSSIER_BUILD}/<path:filename>", "assets", servir)
+
+    # url_for('static', filename=...) pointe vers la version avec empreinte
+    @app.url_defaults
+    def empreinte_statique(endpoint, values):
+        if endpoint == "static" and values.get("filename") in manifest:
+            values["filename"] = manifest[values["filename"]]
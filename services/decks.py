@@ -0,0 +1,79 @@
+# Registre des jeux de cartes. Une carte est codée par sa position dans le jeu :
+# les votes sont stockés sous forme d'entiers et les tables ci-dessous sont calculées une seule fois.
+
+# (libellé, valeur numérique ou None pour une carte spéciale, image dans static ou None)
+_CARTES = {
+    "fibonacci": ("Fibonacci", [
+        ("0", 0, "cartes/cartes_0.svg"),
+        ("1", 1, "cartes/cartes_1.svg"),
+        ("2", 2, "cartes/cartes_2.svg"),
+        ("3", 3, "cartes/cartes_3.svg"),
+        ("5", 5, "cartes/cartes_5.svg"),
+        ("8", 8, "cartes/cartes_8.svg"),
+        ("13", 13, "cartes/cartes_13.svg"),
+        ("20", 20, "cartes/cartes_20.svg"),
+        ("40", 40, "cartes/cartes_40.svg"),
+        ("100", 100, "cartes/cartes_100.svg"),
+        ("?", None, "cartes/cartes_interro.svg"),
+        ("cafe", None, "cartes/cartes_cafe.svg"),
+    ]),
+    "tshirt": ("Tailles T-shirt", [
+        ("XS", 1, None),
+        ("S", 2, None),
+        ("M", 3, None),
+        ("L", 5, None),
+        ("XL", 8, None),
+        ("XXL", 13, None),
+        ("?", None, "cartes/cartes_interro.svg"),
+        ("cafe", None, "cartes/cartes_cafe.svg"),
+    ]),
+    "puissances_2": ("Puissances de 2", [
+        ("0", 0, "cartes/cartes_0.svg"),
+        ("1", 1, "cartes/cartes_1.svg"),
+        ("2", 2, "cartes/cartes_2.svg"),
+        ("4", 4, None),
+        ("8", 8, "cartes/cartes_8.svg"),
+        ("16", 16, None),
+        ("32", 32, None),
+        ("64", 64, None),
+        ("?", None, "cartes/cartes_interro.svg"),
+        ("cafe", None, "cartes/cartes_cafe.svg"),
+    ]),
+}
+
+DECK_PAR_DEFAUT = "fibonacci"
+
+
+def _construire(label, cartes):
+    labels = [carte[0] for carte in cartes]
+    return {
+        "label": label,
+        "labels": labels,
+        "valeurs": [carte[1] for carte in cartes],
+        "speciales": [carte[1] is None for carte in cartes],
+        "images": [carte[2] for carte in cartes],
+        # Valeur enregistrée comme résultat : le nombre pour une carte chiffrée, sinon le libellé
+        "resultats": [int(libelle) if libelle.isdigit() else libelle for libelle in labels],
+        "index": {libelle: code for code, libelle in enumerate(labels)},
+        "cafe": labels.index("cafe"),
+    }
+
+
+DECKS = {nom: _construire(label, cartes) for nom, (label, cartes) in _CARTES.items()}
+
+
+def nom_deck(nom):
+    return nom if nom in DECKS else DECK_PAR_DEFAUT
+
+
+def deck(nom):
+    return DECKS[nom_deck(nom)]
+
+
+def code_valide(jeu, code):
+    return isinstance(code, int) and not isinstance(code, bool) and 0 <= code < len(jeu["labels"])
+
+
+def valeurs_numeriques(jeu, codes):
+    valeurs = jeu["valeurs"]
+    return [valeurs[code] for code in codes if valeurs[code] is not None]
@@ -0,0 +1,33 @@
+from extensions import app, socketio
+from services import scheduler
+
+
+# room -> {(événement, clé): données} ; une seule trame en attente par clé, la plus récente
+_en_attente = {}
+
+
+def diffuser(evenement, donnees, room, cle=None):
+    # Les trames de même clé envoyées entre deux envois sont fusionnées
+    _en_attente.setdefault(room, {})[(evenement, cle)] = donnees
+    demarrer()
+
+
+def vider(room=None):
+    if room is not None:
+        trames = _en_attente.pop(room, None)
+        if trames:
+            _envoyer(room, trames)
+        return
+
+    while _en_attente:
+        room, trames = _en_attente.popitem()
+        _envoyer(room, trames)
+
+
+def _envoyer(room, trames):
+    for (evenement, _), donnees in trames.items():
+        socketio.emit(evenement, donnees, room=room)
+
+
+def demarrer():
+    scheduler.periodique(app.config["BROADCAST_INTERVAL"], vider)
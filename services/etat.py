@@ -0,0 +1,60 @@
+import json
+import time
+from extensions import games
+from services import spectateurs, salon
+
+
+# game_id -> numéro de version, incrémenté à chaque modification
+versions = {}
+
+# game_id -> (version, instantané JSON sérialisé) ; invalidé par modifier()
+_instantanes = {}
+
+# Distingue les versions d'un redémarrage à l'autre (les identifiants de partie sont réutilisés)
+_epoque = int(time.time())
+
+
+def modifier(game_id, problemes=False):
+    # Appelé après chaque changement d'état d'une partie, y compris sa suppression
+    # La version n'est jamais remise à zéro : un identifiant réutilisé ne renvoie pas un ancien ETag
+    versions[game_id] = versions.get(game_id, 0) + 1
+    _instantanes.pop(game_id, None)
+
+    spectateurs.marquer(game_id, problemes)
+    salon.mettre_a_jour(game_id)
+
+
+def etag(game_id):
+    return f"{_epoque}-{game_id}-{versions.get(game_id, 0)}"
+
+
+def instantane(game_id):
+    # Sérialisé une seule fois par version, quel que soit le nombre de lecteurs
+    version = versions.get(game_id, 0)
+    cache = _instantanes.get(game_id)
+    if cache is not None and cache[0] == version:
+        return cache[1]
+
+    game = games[game_id]
+    current = game.get("current_problem")
+    tour = game["rounds"].get(current, {})
+    resultats = game.get("concluded_votes", {})
+    donnees = {
+        "game_id": game_id,
+        "version": version,
+        "mode": game["mode"],
+        "deck": game["deck"],
+        "status": game["status"],
+        "host": game["host"],
+        "players": game["players"],
+        "number_player": int(game["number_player"]),
+        "current_problem": current,
+        "round": {"id": tour.get("id"), "state": tour.get("etat"), "votes_count": len(game["votes"].get(current, {}))},
+        "problems": [
+            {"id": problem, "text": game["problem_texts"][problem], "result": resultats.get(problem)}
+            for problem in game["problems"]
+        ]
+    }
+    corps = json.dumps(donnees).encode()
+    _instantanes[game_id] = (version, corps)
+    return corps
@@ -0,0 +1,135 @@
+import os
+import time
+import numpy as np
+from extensions import app, games
+from services import scheduler, identite, sharding
+
+
+# Historique des votes en colonnes : un fichier binaire par colonne, uniquement complété en fin de fichier.
+# La lecture passe par np.memmap, sans copie ni désérialisation.
+COLONNES = {
+    "game": np.uint32,      # Indice de la session de partie dans jeux.txt
+    "problem": np.uint32,   # Identifiant du problème dans sa partie
+    "user": np.int32,       # Identifiant User, -1 si le pseudo n'a pas de compte
+    "card": np.int16,       # Code de la carte dans le jeu de la partie
+    "round": np.uint16,
+    "timestamp": np.float64,
+}
+
+# Lignes en attente d'écriture, vidées périodiquement et à la sauvegarde d'une partie
+_en_attente = {colonne: [] for colonne in COLONNES}
+
+# Identifiant de partie de chaque indice, et indice de chaque session : les identifiants à 4 chiffres
+# sont réutilisés, la session attribuée à la création de la partie ne l'est pas
+_jeux = []
+_indices = {}
+_ouvert = False
+
+def _dossier():
+    # Un seul écrivain par dossier : chaque worker a le sien
+    return os.path.join(app.instance_path, sharding.par_worker(app.config["HISTORY_DIR"]))
+
+
+def _chemin(colonne):
+    return os.path.join(_dossier(), f"{colonne}.bin")
+
+
+def _longueur(colonne):
+    chemin = _chemin(colonne)
+    return os.path.getsize(chemin) // np.dtype(COLONNES[colonne]).itemsize if os.path.exists(chemin) else 0
+
+
+def _ouvrir():
+    # Un arrêt pendant une écriture peut laisser des colonnes plus longues : elles sont ramenées à la plus courte
+    global _ouvert
+    if _ouvert:
+        return
+    os.makedirs(_dossier(), exist_ok=True)
+    lignes = min(_longueur(colonne) for colonne in COLONNES)
+    for colonne, dtype in COLONNES.items():
+        if os.path.exists(_chemin(colonne)):
+            os.truncate(_chemin(colonne), lignes * np.dtype(dtype).itemsize)
+
+    chemin = os.path.join(_dossier(), "jeux.txt")
+    if os.path.exists(chemin):
+        with open(chemin, encoding="utf-8") as fichier:
+            lignes = [ligne.split(" ", 1) for ligne in fichier.read().splitlines()]
+        _jeux[:] = [ligne[-1] for ligne in lignes]
+        _indices.update((ligne[0], indice) for indice, ligne in enumerate(lignes))
+    _ouvert = True
+
+
+def _indice_jeu(game_id):
+    session = games[game_id]["session"]
+    if session not in _indices:
+        with open(os.path.join(_dossier(), "jeux.txt"), "a", encoding="utf-8") as fichier:
+            fichier.write(f"{session} {game_id}\n")
+        _indices[session] = len(_jeux)
+        _jeux.append(game_id)
+    return _indices[session]
+
+
+def _representable(colonne, valeur):
+    dtype = np.dtype(COLONNES[colonne])
+    if dtype.kind == "f":
+        return True
+    bornes = np.iinfo(dtype)
+    return bornes.min <= valeur <= bornes.max
+
+
+def enregistrer(game_id, problem, round_id, votes):
+    # Votes pris en compte pour un tour dévoilé
+    _ouvrir()
+    jeu = _indice_jeu(game_id)
+    maintenant = time.time()
+    for pseudo, code in votes.items():
+        user = identite.id_utilisateur(pseudo)
+        ligne = {"game": jeu, "problem": problem, "user": -1 if user is None else user,
+                 "card": code, "round": round_id, "timestamp": maintenant}
+        # Une valeur hors du type de sa colonne ferait échouer toutes les écritures suivantes
+        hors_bornes = [colonne for colonne, valeur in ligne.items() if not _representable(colonne, valeur)]
+        if hors_bornes:
+            app.logger.warning("Vote de %s ignoré dans l'historique de la partie %s : %s hors bornes", pseudo, game_id, ", ".join(hors_bornes))
+            continue
+        for colonne, valeur in ligne.items():
+            _en_attente[colonne].append(valeur)
+    demarrer()
+
+
+def vider():
+    if not _en_attente["game"]:
+        return
+    _ouvrir()
+    # Toutes les colonnes sont converties avant la première écriture : elles restent de même longueur
+    tableaux = {colonne: np.asarray(_en_attente[colonne], dtype=dtype) for colonne, dtype in COLONNES.items()}
+    for colonne, tableau in tableaux.items():
+        with open(_chemin(colonne), "ab") as fichier:
+            fichier.write(tableau.tobytes())
+        _en_attente[colonne].clear()
+
+
+def lire():
+    # Colonnes projetées en mémoire en lecture seule, toutes de la même longueur
+    _ouvrir()
+    lignes = min(_longueur(colonne) for colonne in COLONNES)
+    return {
+        colonne: np.memmap(_chemin(colonne), dtype=dtype, mode="r", shape=(lignes,)) if lignes else np.empty(0, dtype=dtype)
+        for colonne, dtype in COLONNES.items()
+    }
+
+
+def jeux():
+    # Décodage de la colonne game
+    _ouvrir()
+    return list(_jeux)
+
+
+def votes_par_utilisateur():
+    colonnes = lire()
+    users = colonnes["user"][colonnes["user"] >= 0]
+    comptes = np.bincount(users)
+    return {int(user): int(compte) for user, compte in enumerate(comptes) if compte}
+
+
+def demarrer():
+    scheduler.periodique(app.config["HISTORY_FLUSH"], vider)
@@ -0,0 +1,43 @@
+from extensions import app
+from models.user import User
+
+
+# sid -> {"id": identifiant de l'utilisateur, "pseudo": pseudo}, résolu une seule fois à la connexion
+utilisateurs = {}
+
+# pseudo -> identifiant, les votes des parties étant indexés par pseudo
+_ids = {}
+
+
+def connecter(sid, pseudo):
+    # Connexion sans session (pages publiques) : aucun événement de partie ne sera accepté
+    user = User.query.filter_by(pseudo=pseudo).first() if pseudo else None
+    if user is None:
+        return None
+    utilisateurs[sid] = {"id": user.id, "pseudo": user.pseudo}
+    _ids[user.pseudo] = user.id
+    return utilisateurs[sid]
+
+
+def deconnecter(sid):
+    utilisateurs.pop(sid, None)
+
+
+def utilisateur(sid):
+    return utilisateurs.get(sid)
+
+
+def pseudo(sid):
+    record = utilisateurs.get(sid)
+    return record["pseudo"] if record else None
+
+
+def id_utilisateur(pseudo):
+    if pseudo not in _ids:
+        # Appelé aussi depuis l'échéancier (fin d'un tour minuté), hors requête
+        with app.app_context():
+            user = User.query.filter_by(pseudo=pseudo).first()
+        if user is None:
+            return None
+        _ids[pseudo] = user.id
+    return _ids[pseudo]
@@ -0,0 +1,62 @@
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+import click
+from sqlalchemy import insert, select
+from extensions import app
+from models.user import db
+from models.resultat import Partie, Estimation
+from services import archives
+
+
+def _lots(iterable, taille):
+    iterateur = iter(iterable)
+    while lot := list(itertools.islice(iterateur, taille)):
+        yield lot
+
+
+def inserer(lot):
+    # Un lot = une transaction : les parties puis toutes leurs estimations en deux requêtes groupées
+    ids = db.session.scalars(
+        insert(Partie).returning(Partie.id, sort_by_parameter_order=True),
+        [{"game_id": partie["game_id"], "mode": partie["mode"], "number_player": partie["number_player"],
+          "deck": partie["deck"], "fichier": chemin} for chemin, partie in lot]
+    ).all()
+    estimations = [
+        {"partie_id": partie_id, "position": position, "probleme": probleme, "difficulte": difficulte}
+        for partie_id, (_, partie) in zip(ids, lot)
+        for position, probleme, difficulte in partie["estimations"]
+    ]
+    if estimations:
+        db.session.execute(insert(Estimation), estimations)
+    db.session.commit()
+
+
+def importer(dossiers, processus=None, taille_lot=1000):
+    # Les fichiers déjà présents en base sont ignorés : une interruption reprend au dernier lot validé
+    deja = set(db.session.scalars(select(Partie.fichier)))
+    chemins = sorted(chemin for chemin in archives.decouvrir(dossiers) if chemin not in deja)
+
+    importees, erreurs = 0, []
+    with ProcessPoolExecutor(max_workers=processus) as pool:
+        lues = pool.map(archives.lire, chemins, chunksize=256)
+        for lot in _lots(lues, taille_lot):
+            valides = [(chemin, partie) for chemin, partie, erreur in lot if erreur is None]
+            erreurs += [(chemin, erreur) for chemin, _, erreur in lot if erreur is not None]
+            if valides:
+                inserer(valides)
+            importees += len(valides)
+            click.echo(f"{importees}/{len(chemins)} partie(s) importée(s)")
+    return len(deja), importees, erreurs
+
+
+@app.cli.command("import-resultats")
+@click.argument("dossiers", nargs=-1, required=True, type=click.Path(exists=True, file_okay=False))
+@click.option("--processus", type=int, default=None, help="Processus de lecture (par défaut : un par cœur)")
+@click.option("--lot", "taille_lot", type=int, default=1000, show_default=True, help="Fichiers par transaction")
+def import_resultats(dossiers, processus, taille_lot):
+    """Importe en base les fichiers {game_id}_resultats.json trouvés dans DOSSIERS."""
+    deja, importees, erreurs = importer(dossiers, processus, taille_lot)
+    for chemin, erreur in erreurs:
+        click.echo(f"Ignoré {os.path.relpath(chemin)} : {erreur}", err=True)
+    click.echo(f"{importees} partie(s) importée(s), {deja} déjà en base, {len(erreurs)} fichier(s) invalide(s)")
@@ -0,0 +1,28 @@
+# Conversion d'une partie en JSON et retour (transfert entre workers, sauvegarde à l'arrêt)
+import uuid
+
+# Dictionnaires indexés par identifiant de problème : JSON transforme leurs clés en chaînes
+_PAR_PROBLEME = ("problem_texts", "votes", "rounds", "concluded_votes", "results", "difficulte", "premiers_votes", "suggestions")
+
+# Données propres au processus, reconstruites à l'import
+_LOCALES = ("minuteur",)
+
+
+def exporter(game):
+    return {cle: valeur for cle, valeur in game.items() if cle not in _LOCALES}
+
+
+def importer(donnees):
+    game = dict(donnees)
+    for cle in _PAR_PROBLEME:
+        if cle in game:
+            game[cle] = {int(problem): valeur for problem, valeur in game[cle].items()}
+
+    # Instantané antérieur aux sessions : la partie en reçoit une
+    game.setdefault("session", uuid.uuid4().hex)
+
+    # Un tour interrompu pendant son dévoilement redevient ouvert
+    for tour in game.get("rounds", {}).values():
+        if tour["etat"] == "devoile":
+            tour["etat"] = "ouvert"
+    return game
@@ -0,0 +1,103 @@
+import time
+from extensions import app, socketio, games
+from services import scheduler, etat
+
+
+# sid -> (game_id, pseudo)
+sessions = {}
+
+# (game_id, pseudo) -> ensemble des sids ouverts pour ce joueur
+connexions = {}
+
+# (game_id, pseudo) -> instant où le joueur a perdu sa dernière connexion
+en_attente = {}
+
+# Parties dont la liste des joueurs doit être renvoyée au prochain envoi groupé
+a_publier = set()
+
+
+def connecter(sid, game_id, pseudo):
+    cle = (game_id, pseudo)
+    sessions[sid] = cle
+    connexions.setdefault(cle, set()).add(sid)
+    en_attente.pop(cle, None)
+    a_publier.add(game_id)
+
+
+def attendre(game_id, pseudo):
+    # Joueur ajouté depuis le tableau de bord mais pas encore connecté en Socket.IO
+    cle = (game_id, pseudo)
+    if cle not in connexions:
+        en_attente[cle] = time.monotonic()
+
+
+def deconnecter(sid):
+    cle = sessions.pop(sid, None)
+    if cle is None:
+        return None
+
+    sids = connexions.get(cle)
+    if sids is not None:
+        sids.discard(sid)
+        if not sids:
+            # Dernier onglet fermé : le joueur garde sa place pendant le délai de grâce
+            del connexions[cle]
+            en_attente[cle] = time.monotonic()
+            a_publier.add(cle[0])
+    return cle
+
+
+def connectes(game_id):
+    return [pseudo for pseudo in games[game_id]["players"] if (game_id, pseudo) in connexions]
+
+
+def votes_actifs(game_id, votes):
+    # Ne garde que les votes des joueurs encore présents dans la partie
+    players = games[game_id]["players"]
+    return {pseudo: vote for pseudo, vote in votes.items() if pseudo in players}
+
+
+def expirer(maintenant=None):
+    if maintenant is None:
+        maintenant = time.monotonic()
+    limite = maintenant - app.config["PRESENCE_GRACE"]
+
+    for cle, depuis in list(en_attente.items()):
+        if depuis > limite:
+            continue
+        del en_attente[cle]
+
+        game_id, pseudo = cle
+        game = games.get(game_id)
+        if game is None or pseudo not in game["players"]:
+            continue
+        game["players"].remove(pseudo)
+        a_publier.add(game_id)
+
+        # Plus personne dans la partie : on libère la salle
+        if not game["players"]:
+            scheduler.annuler(game.get("minuteur"))
+            del games[game_id]
+            a_publier.discard(game_id)
+        etat.modifier(game_id)
+
+
+def publier():
+    while a_publier:
+        game_id = a_publier.pop()
+        if game_id not in games:
+            continue
+        socketio.emit("update_players", {
+            "players": games[game_id]["players"],
+            "connected": connectes(game_id),
+            "host": games[game_id]["host"]
+        }, room=game_id)
+
+
+def _cycle():
+    expirer()
+    publier()
+
+
+def demarrer():
+    scheduler.periodique(app.config["PRESENCE_FLUSH"], _cycle)
@@ -0,0 +1,96 @@
+import time
+from functools import wraps
+from flask import request
+from extensions import app
+from services import scheduler, presence
+
+
+# (portée, identifiant, événement) -> [jetons restants, instant de la dernière recharge]
+_seaux = {}
+
+# (portée, identifiant, événement) -> [instant du dernier avertissement, événements ignorés depuis]
+_ignores = {}
+
+
+def _budget(evenement, portee):
+    limites = app.config["RATE_LIMITS"]
+    return limites.get(evenement, limites["default"]).get(portee)
+
+
+def _consommer(cle, budget, maintenant):
+    capacite, debit = budget
+    seau = _seaux.get(cle)
+    if seau is None:
+        seau = _seaux[cle] = [capacite, maintenant]
+    else:
+        seau[0] = min(capacite, seau[0] + (maintenant - seau[1]) * debit)
+        seau[1] = maintenant
+
+    if seau[0] < 1:
+        return False
+    seau[0] -= 1
+    return True
+
+
+def _refus(evenement, sid, maintenant):
+    # Renvoie le seau épuisé, ou None si l'événement passe
+    cle = ("sid", sid, evenement)
+    budget = _budget(evenement, "sid")
+    if budget and not _consommer(cle, budget, maintenant):
+        return cle
+
+    # Seau de la partie réellement rejointe par ce sid, jamais celle annoncée dans l'événement :
+    # un client extérieur ne peut pas épuiser le budget d'une autre partie
+    session = presence.sessions.get(sid)
+    budget = _budget(evenement, "room")
+    if session is not None and budget:
+        cle = ("room", session[0], evenement)
+        if not _consommer(cle, budget, maintenant):
+            return cle
+    return None
+
+
+def autoriser(evenement, sid, maintenant=None):
+    return _refus(evenement, sid, time.monotonic() if maintenant is None else maintenant) is None
+
+
+def _signaler(cle, maintenant):
+    # Un seul avertissement par seau et par intervalle, même sous un flot d'événements
+    signal = _ignores.setdefault(cle, [None, 0])
+    signal[1] += 1
+    if signal[0] is None or maintenant - signal[0] >= app.config["RATE_LIMIT_LOG_INTERVAL"]:
+        app.logger.warning("Limite atteinte pour %s (%s %s) : %d événement(s) ignoré(s)", cle[2], cle[0], cle[1], signal[1])
+        signal[0], signal[1] = maintenant, 0
+
+
+def limite(evenement):
+    # A placer sous @socketio.on : les événements hors budget sont ignorés sans réponse
+    def decorateur(handler):
+        @wraps(handler)
+        def enveloppe(data=None, *args):
+            demarrer()
+            maintenant = time.monotonic()
+            cle = _refus(evenement, request.sid, maintenant)
+            if cle is not None:
+                _signaler(cle, maintenant)
+                return None
+            return handler(data, *args)
+        return enveloppe
+    return decorateur
+
+
+def nettoyer(maintenant=None):
+    # Un seau inactif assez longtemps est plein : inutile de le garder
+    if maintenant is None:
+        maintenant = time.monotonic()
+    limite_inactivite = maintenant - app.config["RATE_LIMIT_IDLE"]
+    for cle, seau in list(_seaux.items()):
+        if seau[1] < limite_inactivite:
+            del _seaux[cle]
+    for cle, signal in list(_ignores.items()):
+        if signal[0] < limite_inactivite:
+            del _ignores[cle]
+
+
+def demarrer():
+    scheduler.periodique(app.config["RATE_LIMIT_IDLE"], nettoyer)
@@ -0,0 +1,90 @@
+from itertools import islice
+from extensions import app, socketio, games
+from services import scheduler
+
+
+ROOM = "lobby"
+
+# game_id -> entrée affichée dans le salon
+entrees = {}
+
+# Index maintenus à chaque modification : jamais de parcours de toutes les parties
+par_statut = {}
+par_mode = {}
+libres = set()
+
+# Différences en attente pour le canal du salon : game_id -> entrée, ou None si la partie a disparu
+_diffs = {}
+
+
+def _entree(game_id):
+    game = games[game_id]
+    return {
+        "game_id": game_id,
+        "host": game["host"],
+        "mode": game["mode"],
+        "status": game["status"],
+        "players": len(game["players"]),
+        "number_player": int(game["number_player"]),
+    }
+
+
+def _retirer(entree):
+    game_id = entree["game_id"]
+    par_statut[entree["status"]].discard(game_id)
+    par_mode[entree["mode"]].discard(game_id)
+    libres.discard(game_id)
+
+
+def mettre_a_jour(game_id):
+    ancienne = entrees.get(game_id)
+    nouvelle = _entree(game_id) if game_id in games else None
+    if nouvelle == ancienne:
+        return
+
+    if ancienne is not None:
+        _retirer(ancienne)
+    if nouvelle is None:
+        del entrees[game_id]
+    else:
+        entrees[game_id] = nouvelle
+        par_statut.setdefault(nouvelle["status"], set()).add(game_id)
+        par_mode.setdefault(nouvelle["mode"], set()).add(game_id)
+        if nouvelle["players"] < nouvelle["number_player"]:
+            libres.add(game_id)
+
+    _diffs[game_id] = nouvelle
+
+
+def rechercher(status=None, mode=None, libre=False, limite=None):
+    ensembles = []
+    if status:
+        ensembles.append(par_statut.get(status, set()))
+    if mode:
+        ensembles.append(par_mode.get(mode, set()))
+    if libre:
+        ensembles.append(libres)
+
+    if ensembles:
+        # L'intersection part du plus petit index
+        ensembles.sort(key=len)
+        candidats = ensembles[0].intersection(*ensembles[1:])
+    else:
+        candidats = entrees.keys()
+
+    if limite is None:
+        limite = app.config["LOBBY_PAGE"]
+    return [entrees[game_id] for game_id in islice(candidats, limite)]
+
+
+def publier():
+    if not _diffs:
+        return
+    mises_a_jour = [entree for entree in _diffs.values() if entree is not None]
+    retirees = [game_id for game_id, entree in _diffs.items() if entree is None]
+    _diffs.clear()
+    socketio.emit("lobby_update", {"updated": mises_a_jour, "removed": retirees}, room=ROOM)
+
+
+def demarrer():
+    scheduler.periodique(app.config["LOBBY_INTERVAL"], publier)
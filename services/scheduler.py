@@ -0,0 +1,86 @@
+import functools
+import heapq
+import itertools
+import time
+from extensions import app, socketio
+
+
+# Tas des tâches planifiées : (échéance, jeton, fonction, arguments)
+_taches = []
+
+# Jetons annulés, retirés du tas seulement quand leur échéance arrive
+_annulees = set()
+
+_jetons = itertools.count(1)
+
+_demarre = False
+
+# Fonctions déjà relancées périodiquement
+_periodiques = set()
+
+
+def planifier(delai, fonction, *args):
+    jeton = next(_jetons)
+    heapq.heappush(_taches, (time.monotonic() + delai, jeton, fonction, args))
+    return jeton
+
+
+def annuler(jeton):
+    if jeton is not None:
+        _annulees.add(jeton)
+
+
+def executer(maintenant=None):
+    if maintenant is None:
+        maintenant = time.monotonic()
+
+    # Une tâche planifiée pendant ce passage attend le suivant, même déjà échue :
+    # une tâche qui se replanifie sans délai ne peut pas bloquer la boucle
+    limite = next(_jetons)
+    reportees = []
+    while _taches and _taches[0][0] <= maintenant:
+        tache = heapq.heappop(_taches)
+        _, jeton, fonction, args = tache
+        if jeton > limite:
+            reportees.append(tache)
+            continue
+        if jeton in _annulees:
+            _annulees.discard(jeton)
+            continue
+        try:
+            fonction(*args)
+        except Exception:
+            # Une tâche en erreur ne doit pas arrêter les minuteurs des autres parties
+            app.logger.exception("Erreur dans la tâche planifiée %s", fonction.__name__)
+    for tache in reportees:
+        heapq.heappush(_taches, tache)
+
+
+def periodique(intervalle, fonction):
+    # Relance fonction toutes les intervalle secondes ; sans effet si elle tourne déjà
+    if fonction in _periodiques:
+        return
+    _periodiques.add(fonction)
+
+    @functools.wraps(fonction)
+    def cycle():
+        # Replanifiée avant l'exécution : une erreur n'interrompt pas le cycle
+        planifier(intervalle, cycle)
+        fonction()
+
+    planifier(intervalle, cycle)
+    demarrer()
+
+
+def _boucle():
+    while True:
+        socketio.sleep(app.config["SCHEDULER_TICK"])
+        executer()
+
+
+def demarrer():
+    # Une seule tâche de fond pour tous les minuteurs du processus
+    global _demarre
+    if not _demarre:
+        _demarre = True
+        socketio.start_background_task(_boucle)
@@ -0,0 +1,91 @@
+import bisect
+import hashlib
+import json
+import os
+import re
+import threading
+import urllib.request
+from extensions import app, socketio
+
+
+# Anneau de hachage cohérent : positions triées et worker associé à chaque position
+_positions = []
+_workers = []
+
+
+def _hacher(cle):
+    return int.from_bytes(hashlib.md5(cle.encode()).digest()[:8], "big")
+
+
+def configurer(shards):
+    # Chaque worker occupe plusieurs positions pour répartir les parties uniformément
+    app.config["SHARDS"] = list(shards)
+    points = sorted(
+        (_hacher(f"{shard}#{i}"), shard)
+        for shard in shards
+        for i in range(app.config["SHARD_VNODES"])
+    )
+    _positions[:] = [position for position, _ in points]
+    _workers[:] = [shard for _, shard in points]
+
+
+def actif():
+    return bool(_positions)
+
+
+def proprietaire(game_id):
+    if not _positions:
+        return app.config["SHARD_URL"]
+    index = bisect.bisect(_positions, _hacher(str(game_id))) % len(_positions)
+    return _workers[index]
+
+
+def est_local(game_id):
+    return not _positions or proprietaire(game_id) == app.config["SHARD_URL"]
+
+
+def url(game_id, chemin):
+    return proprietaire(game_id).rstrip("/") + chemin
+
+
+def par_worker(nom):
+    # Fichier ou dossier de l'instance propre à ce worker : les workers d'une même machine partagent le dossier instance
+    adresse = app.config["SHARD_URL"]
+    if not adresse:
+        return nom
+    racine, extension = os.path.splitext(nom)
+    return f"{racine}.{re.sub(r'[^A-Za-z0-9]+', '_', adresse.split('://', 1)[-1]).strip('_')}{extension}"
+
+
+def autorise(requete):
+    jeton = app.config["SHARD_TOKEN"]
+    return bool(jeton) and requete.headers.get("X-Shard-Token") == jeton
+
+
+def envoyer(shard, chemin, donnees):
+    requete = urllib.request.Request(
+        shard.rstrip("/") + chemin,
+        data=json.dumps(donnees).encode(),
+        headers={"Content-Type": "application/json", "X-Shard-Token": app.config["SHARD_TOKEN"]},
+        method="POST",
+    )
+    resultat = {}
+
+    def appel():
+        try:
+            with urllib.request.urlopen(requete, timeout=app.config["SHARD_TIMEOUT"]) as reponse:
+                resultat["envoye"] = reponse.status == 200
+        except OSError as erreur:
+            resultat["erreur"] = erreur
+
+    # urlopen bloquerait tout le worker : la requête part dans un thread, les autres parties sont servies en attendant
+    fil = threading.Thread(target=appel, daemon=True)
+    fil.start()
+    while fil.is_alive():
+        socketio.sleep(0.05)
+    if "erreur" in resultat:
+        raise resultat["erreur"]
+    return resultat["envoye"]
+
+
+configurer(app.config["SHARDS"])
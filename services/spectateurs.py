@@ -0,0 +1,52 @@
+from extensions import app, socketio, games
+from services import scheduler
+
+
+# game_id -> True si la liste des problèmes doit accompagner le prochain résumé
+a_publier = {}
+
+
+def room(game_id):
+    # Sous-room des spectateurs : ne reçoit que les résumés, jamais update_votes
+    return f"{game_id}:spectateurs"
+
+
+def marquer(game_id, problemes=False):
+    a_publier[game_id] = a_publier.get(game_id, False) or problemes
+
+
+def problemes(game_id):
+    game = games[game_id]
+    return [{"id": problem, "text": game["problem_texts"][problem]} for problem in game["problems"]]
+
+
+def resume(game_id):
+    game = games[game_id]
+    current = game.get("current_problem")
+    tour = game["rounds"].get(current, {})
+    return {
+        "status": game["status"],
+        "players": len(game["players"]),
+        "current_problem": current,
+        "round": tour.get("id"),
+        "round_state": tour.get("etat"),
+        "votes_count": len(game["votes"].get(current, {})),
+        "results": game.get("concluded_votes", {})
+    }
+
+
+def publier():
+    while a_publier:
+        game_id, avec_problemes = a_publier.popitem()
+        if game_id not in games:
+            socketio.emit("game_ended", {"message": "La partie est terminée."}, room=room(game_id))
+            continue
+
+        donnees = resume(game_id)
+        if avec_problemes:
+            donnees["problems"] = problemes(game_id)
+        socketio.emit("room_summary", donnees, room=room(game_id))
+
+
+def demarrer():
+    scheduler.periodique(app.config["SPECTATOR_INTERVAL"], publier)
@@ -0,0 +1,133 @@
+import heapq
+import math
+import re
+from collections import Counter, defaultdict
+from sqlalchemy import select
+from extensions import app, socketio
+from models.user import db
+from models.resultat import Estimation
+
+
+# Index inversé TF-IDF des problèmes déjà estimés : mot -> {document: occurrences}
+_postings = defaultdict(dict)
+_normes = []        # Norme TF-IDF de chaque document
+_documents = []     # (texte, difficulté conclue, mots)
+_demarre = False
+
+# Les normes sont calculées avec l'idf du moment et recalculées chaque fois que l'index double
+_base = 1
+_recalcul = False
+
+# Documents traités entre deux pauses des tâches de fond, pour laisser passer les autres gestionnaires
+_LOT = 500
+
+_MOTS = re.compile(r"\w{2,}")
+_VIDES = {"le", "la", "les", "un", "une", "des", "de", "du", "et", "ou", "en", "au", "aux", "pour", "par", "sur",
+          "dans", "avec", "qui", "que", "est", "the", "and", "or", "of", "to", "in", "for", "on", "with", "as", "is"}
+
+
+def _mots(texte):
+    return Counter(mot for mot in _MOTS.findall(texte.lower()) if mot not in _VIDES)
+
+
+def _difficulte(valeur):
+    # Les difficultés archivées sont stockées en texte : "5" redevient 5
+    try:
+        nombre = float(valeur)
+    except ValueError:
+        return valeur
+    return int(nombre) if nombre.is_integer() else nombre
+
+
+def _idf(mot):
+    return math.log(1 + len(_documents) / len(_postings[mot]))
+
+
+def _norme(mots):
+    return math.sqrt(sum((n * _idf(mot)) ** 2 for mot, n in mots.items()))
+
+
+def ajouter(texte, difficulte):
+    global _base, _recalcul
+    if difficulte is None:
+        return
+    mots = _mots(texte)
+    if not mots:
+        return
+    document = len(_documents)
+    _documents.append((texte, difficulte, mots))
+    for mot, n in mots.items():
+        _postings[mot][document] = n
+    _normes.append(_norme(mots))
+
+    if len(_documents) >= 2 * _base and not _recalcul:
+        _base = len(_documents)
+        _recalcul = True
+        socketio.start_background_task(_recalculer)
+
+
+def _recalculer():
+    # Hors du dévoilement : les normes sont mises à jour par lots, l'ancienne valeur sert en attendant
+    global _recalcul
+    try:
+        for debut in range(0, len(_documents), _LOT):
+            for document in range(debut, min(debut + _LOT, len(_documents))):
+                _normes[document] = _norme(_documents[document][2])
+            socketio.sleep(0)
+    finally:
+        _recalcul = False
+
+
+def _charger():
+    # Estimations importées (flask import-resultats), lues par lots au démarrage du worker
+    with app.app_context():
+        lignes = db.session.execute(select(Estimation.probleme, Estimation.difficulte).where(Estimation.difficulte.is_not(None)))
+        for lot in lignes.partitions(_LOT):
+            for texte, difficulte in lot:
+                ajouter(texte, _difficulte(difficulte))
+            socketio.sleep(0)
+
+
+def demarrer():
+    # Chargement en tâche de fond : les suggestions s'enrichissent à mesure, sans bloquer les parties
+    global _demarre
+    if not _demarre:
+        _demarre = True
+        socketio.start_background_task(_charger)
+
+
+def suggerer(textes):
+    # Un seul passage pour tout le lot : l'idf de chaque mot est calculé une fois pour tous les textes
+    demarrer()
+    requetes = [_mots(texte) for texte in textes]
+    idf = {mot: _idf(mot) for mot in set().union(*requetes) if mot in _postings}
+
+    resultats = []
+    for mots in requetes:
+        # Similarité cosinus entre vecteurs TF-IDF, calculée seulement pour les documents partageant un mot
+        norme = math.sqrt(sum((n * idf.get(mot, 0)) ** 2 for mot, n in mots.items())) or 1
+        scores = defaultdict(float)
+        for mot, n in mots.items():
+            if mot not in idf:
+                continue
+            poids = n * idf[mot] * idf[mot]
+            for document, occurrences in _postings[mot].items():
+                scores[document] += poids * occurrences
+        similarites = ((document, score / (norme * _normes[document])) for document, score in scores.items())
+        resultats.append(_synthese(heapq.nlargest(app.config["SUGGESTION_TOP"], similarites, key=lambda item: item[1])))
+    return resultats
+
+
+def _synthese(proches):
+    # Difficulté la plus soutenue parmi les problèmes les plus proches, pondérée par leur score
+    proches = [(document, score) for document, score in proches if score >= app.config["SUGGESTION_MIN_SCORE"]]
+    if not proches:
+        return None
+    poids = defaultdict(float)
+    for document, score in proches:
+        poids[_documents[document][1]] += score
+    return {
+        "difficulte": max(poids, key=poids.get),
+        "similar": [{"text": _documents[document][0], "difficulte": _documents[document][1], "score": round(score, 3)}
+                    for document, score in proches[:3]],
+    }
@@ -0,0 +1,86 @@
+import hashlib
+import itertools
+import json
+import os
+import time
+from extensions import app, socketio, games
+from services import identite
+
+
+# Enregistrement des événements Socket.IO reçus (TRACE_FILE), pour les rejouer avec tools/replay.py.
+# Une ligne JSON par événement ; les pseudos sont remplacés par une empreinte salée propre au processus.
+_fichier = None
+_debut = None
+_sel = os.urandom(16)
+
+_connexions = {}                # sid -> numéro de connexion dans la trace
+_numeros = itertools.count(1)
+_decrites = {}                  # game_id -> partie déjà décrite (un identifiant peut être réutilisé)
+
+
+def _anonyme(pseudo):
+    return None if pseudo is None else hashlib.sha256(_sel + pseudo.encode()).hexdigest()[:12]
+
+
+def _ecrire(ligne):
+    _fichier.write(json.dumps(ligne, separators=(",", ":"), default=str) + "\n")
+
+
+def _decrire(game_id, instant, sid=None):
+    # Paramètres de la partie, pour la recréer à l'identique au rejeu
+    game = games.get(game_id)
+    if game is None or _decrites.get(game_id) is game:
+        return
+    _decrites[game_id] = game
+    _ecrire({
+        "t": instant, "event": "@game", "game_id": game_id, "host": _anonyme(game["host"]),
+        "mode": game["mode"], "deck": game["deck"], "number_player": game["number_player"],
+        "round_duration": game.get("round_duration", 0),
+        # Partie créée par upload_backlog : le rejeu reprend l'identifiant renvoyé à cette connexion
+        "upload": sid,
+    })
+
+
+def _tracer(evenement, handler):
+    def enveloppe(sid, *args):
+        instant = round(time.monotonic() - _debut, 4)
+
+        if evenement == "connect":
+            resultat = handler(sid, *args)
+            _connexions[sid] = next(_numeros)
+            _ecrire({"t": instant, "sid": _connexions[sid], "event": "connect", "user": _anonyme(identite.pseudo(sid))})
+            return resultat
+
+        donnees = args[0] if args else None
+        if isinstance(donnees, dict):
+            if donnees.get("game_id") in games:
+                _decrire(donnees["game_id"], instant)
+            donnees = {cle: valeur for cle, valeur in donnees.items() if cle != "pseudo"}
+        _ecrire({"t": instant, "sid": _connexions.get(sid), "event": evenement, "data": donnees})
+
+        if evenement == "upload_backlog":
+            avant = set(games)
+            resultat = handler(sid, *args)
+            for game_id in games.keys() - avant:
+                _decrire(game_id, instant, _connexions.get(sid))
+            return resultat
+        if evenement == "disconnect":
+            resultat = handler(sid, *args)
+            _connexions.pop(sid, None)
+            return resultat
+        return handler(sid, *args)
+    return enveloppe
+
+
+def installer():
+    # À appeler une fois tous les gestionnaires déclarés ; sans TRACE_FILE rien n'est enregistré
+    global _fichier, _debut
+    chemin = app.config["TRACE_FILE"]
+    if not chemin or _fichier is not None:
+        return
+    _fichier = open(chemin, "a", buffering=1, encoding="utf-8")
+    _debut = time.monotonic()
+    _ecrire({"t": 0, "event": "@start", "wall": time.time()})
+    for evenements in socketio.server.handlers.values():
+        for evenement, handler in list(evenements.items()):
+            evenements[evenement] = _tracer(evenement, handler)
@@ -0,0 +1,54 @@
+import os
+import sys
+
+import pytest
+
+# Base en mémoire : les tests ne touchent pas à instance/users.db
+os.environ.setdefault("DATABASE_URI", "sqlite://")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import app as application, socketio
+from extensions import db, games
+from models.user import User
+
+
+@pytest.fixture(scope="session", autouse=True)
+def instance(tmp_path_factory):
+    # Historique, statistiques et instantanés écrits dans un dossier jetable, ouvert une fois par processus
+    application.config["TESTING"] = True
+    application.instance_path = str(tmp_path_factory.mktemp("instance"))
+    return application.instance_path
+
+
+@pytest.fixture
+def app():
+    yield application
+    games.clear()
+
+
+@pytest.fixture
+def connexion(app):
+    # Client HTTP et client Socket.IO partageant la session d'un joueur inscrit
+    def connexion(pseudo):
+        with app.app_context():
+            if User.query.filter_by(pseudo=pseudo).first() is None:
+                db.session.add(User(pseudo=pseudo))
+                db.session.commit()
+        client = app.test_client()
+        client.post("/login", data={"pseudo": pseudo})
+        return client, socketio.test_client(app, flask_test_client=client)
+    return connexion
+
+
+@pytest.fixture
+def partie(connexion):
+    # Partie en mode moyenne créée par alice, sans minuteur par défaut
+    def partie(joueurs=2, duree=0, deck="fibonacci"):
+        client, sio = connexion("alice")
+        reponse = client.post("/dashboard", data={"create_game": "1", "game_mode": "moyenne", "number_player": str(joueurs),
+                                                  "deck": deck, "round_duration": str(duree)})
+        game_id = reponse.headers["Location"].rsplit("/", 1)[-1]
+        sio.emit("join_room", {"game_id": game_id})
+        sio.get_received()
+        return game_id, client, sio
+    return partie
@@ -0,0 +1,40 @@
+from extensions import games
+
+
+def test_etat_de_la_partie(partie):
+    game_id, client, _ = partie()
+    reponse = client.get(f"/api/games/{game_id}")
+    assert reponse.status_code == 200
+    assert reponse.headers["Cache-Control"] == "no-cache"
+    assert reponse.json["game_id"] == game_id and reponse.json["players"] == ["alice"]
+
+
+def test_partie_inconnue(app):
+    assert app.test_client().get("/api/games/0000").status_code == 404
+
+
+def test_revalidation_sans_changement(partie):
+    game_id, client, _ = partie()
+    etag = client.get(f"/api/games/{game_id}").headers["ETag"]
+
+    reponse = client.get(f"/api/games/{game_id}", headers={"If-None-Match": etag})
+    assert reponse.status_code == 304
+    assert reponse.data == b"" and reponse.headers["ETag"] == etag
+
+
+def test_nouvel_etag_apres_modification(partie):
+    game_id, client, sio = partie()
+    etag = client.get(f"/api/games/{game_id}").headers["ETag"]
+
+    sio.emit("add_problem", {"game_id": game_id, "problem": "Connexion"})
+    reponse = client.get(f"/api/games/{game_id}", headers={"If-None-Match": etag})
+    assert reponse.status_code == 200
+    assert reponse.headers["ETag"] != etag
+    assert [probleme["text"] for probleme in reponse.json["problems"]] == ["Connexion"]
+
+
+def test_lecture_sans_rejoindre(partie, connexion):
+    game_id, _, _ = partie()
+    client, _ = connexion("bob")
+    assert client.get(f"/api/games/{game_id}").status_code == 200
+    assert games[game_id]["players"] == ["alice"]
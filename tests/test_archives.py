@@ -0,0 +1,34 @@
+import json
+
+import pytest
+
+from services import archives
+
+
+def ecrire(tmp_path, donnees):
+    chemin = tmp_path / f"1234{archives.SUFFIXE}"
+    chemin.write_text(json.dumps(donnees), encoding="utf-8")
+    return str(chemin)
+
+
+def test_archive_valide(tmp_path):
+    chemin = ecrire(tmp_path, {"partie_id": 1234, "mode_de_jeu": "moyenne", "number_player": "3", "deck": "fibonacci",
+                               "resultats": [{"probleme": "Connexion", "difficulte": 5}, {"probleme": "Export", "difficulte": None}]})
+    _, partie, erreur = archives.lire(chemin)
+    assert erreur is None
+    assert partie["game_id"] == "1234" and partie["number_player"] == 3
+    assert partie["estimations"] == [(0, "Connexion", "5"), (1, "Export", None)]
+
+
+@pytest.mark.parametrize("champs", [
+    {"number_player": [3]},
+    {"number_player": {}},
+    {"number_player": "trois"},
+    {"number_player": True},
+    {"mode_de_jeu": {"nom": "moyenne"}},
+    {"deck": ["fibonacci"]},
+])
+def test_archive_invalide_erreur_par_fichier(tmp_path, champs):
+    chemin = ecrire(tmp_path, dict({"partie_id": "1234", "resultats": []}, **champs))
+    _, partie, erreur = archives.lire(chemin)
+    assert partie is None and erreur
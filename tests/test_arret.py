@@ -0,0 +1,51 @@
+import os
+
+import pytest
+
+from extensions import games, socketio
+from routes import shards
+from services import arret, persistance, sharding
+
+ICI, AILLEURS = "http://a:5000", "http://b:5000"
+
+
+@pytest.fixture(autouse=True)
+def worker(app, monkeypatch, tmp_path):
+    monkeypatch.setattr(app, "instance_path", str(tmp_path))
+    monkeypatch.setitem(app.config, "SHARD_URL", ICI)
+    monkeypatch.setattr(arret, "en_cours", False)
+    yield
+    sharding.configurer([])
+
+
+def test_instantane_propre_au_worker(app, partie):
+    game_id, _, _ = partie()
+    arret.sauvegarder()
+    assert os.listdir(app.instance_path) == ["parties.a_5000.json"]
+
+    # Un autre worker partageant le dossier ne reprend pas ces parties
+    app.config["SHARD_URL"] = AILLEURS
+    assert arret.charger() == {}
+    app.config["SHARD_URL"] = ICI
+    assert list(arret.charger()) == [game_id]
+
+
+def test_parties_d_un_autre_worker_renvoyees(app, partie, monkeypatch):
+    game_id, _, _ = partie()
+    arret.sauvegarder()
+    games.clear()
+
+    taches = []
+    monkeypatch.setattr(socketio, "start_background_task", lambda cible, *args: taches.append(cible))
+    sharding.configurer([AILLEURS])
+    shards.restaurer()
+
+    # Servie ici jusqu'à son transfert, lancé en tâche de fond
+    assert game_id in games
+    assert shards.reequilibrer in taches
+
+
+def test_session_conservee(partie):
+    game_id, _, _ = partie()
+    session = games[game_id]["session"]
+    assert persistance.importer(persistance.exporter(games[game_id]))["session"] == session
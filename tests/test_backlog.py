@@ -0,0 +1,56 @@
+import json
+
+import pytest
+
+from extensions import games
+from services import salon
+
+
+def importer(sio, backlog):
+    sio.get_received()
+    sio.emit("upload_backlog", {"file_data": json.dumps(backlog)})
+    return {message["name"]: message["args"][0] for message in sio.get_received()}
+
+
+@pytest.mark.parametrize("backlog", [
+    {"partie_id": "<img src=x onerror=alert(1)>", "resultats": []},
+    {"partie_id": "1234", "number_player": [3], "resultats": []},
+    {"partie_id": "1234", "number_player": "trois", "resultats": []},
+    {"partie_id": "1234", "mode_de_jeu": {"moyenne": 1}, "resultats": []},
+    {"partie_id": "1234", "resultats": [{"difficulte": 3}]},
+    {"partie_id": "1234", "duree_tour": -1, "resultats": []},
+    {"partie_id": "1234", "duree_tour": "vite", "resultats": []},
+    {"partie_id": "1234", "resultats": []},
+    {"partie_id": "1234", "mode_de_jeu": "inconnu", "resultats": []},
+    ["pas", "un", "objet"],
+])
+def test_backlog_invalide_refuse_sans_creer_de_partie(connexion, backlog):
+    _, sio = connexion("alice")
+    recus = importer(sio, backlog)
+    assert "error" in recus and "redirect_to_game_room" not in recus
+    assert not games
+
+
+def test_nombre_de_joueurs_par_defaut(connexion):
+    _, sio = connexion("alice")
+    recus = importer(sio, {"partie_id": 4321, "mode_de_jeu": "moyenne", "resultats": [{"probleme": "Connexion", "difficulte": None}]})
+    game_id = recus["redirect_to_game_room"]["game_id"]
+    assert game_id == "4321"
+    assert salon.entrees[game_id]["number_player"] == 6
+    assert games[game_id]["problem_texts"] == {1: "Connexion"}
+
+
+def test_backlog_plus_grand_qu_un_lot(app, connexion):
+    _, sio = connexion("alice")
+    nombre = app.config["PROBLEM_BATCH_MAX"] + 1
+    recus = importer(sio, {"mode_de_jeu": "moyenne", "resultats": [{"probleme": f"Story {numero}", "difficulte": None}
+                                                                  for numero in range(nombre)]})
+    game_id = recus["redirect_to_game_room"]["game_id"]
+    assert len(games[game_id]["problems"]) == nombre
+
+
+def test_mode_inconnu_refuse_au_tableau_de_bord(connexion):
+    client, _ = connexion("alice")
+    reponse = client.post("/dashboard", data={"create_game": "1", "game_mode": "inconnu", "number_player": "2"})
+    assert "Mode de jeu invalide".encode() in reponse.data
+    assert not games
@@ -0,0 +1,54 @@
+import pytest
+
+from extensions import games
+from services import decks
+
+
+@pytest.mark.parametrize("nom", list(decks.DECKS))
+def test_code_et_libelle_reversibles(nom):
+    jeu = decks.deck(nom)
+    assert [jeu["index"][libelle] for libelle in jeu["labels"]] == list(range(len(jeu["labels"])))
+    assert jeu["labels"][jeu["cafe"]] == "cafe"
+
+
+def test_jeu_inconnu_remplace_par_defaut():
+    assert decks.nom_deck("tarot") == decks.DECK_PAR_DEFAUT
+    assert decks.deck(None) is decks.DECKS[decks.DECK_PAR_DEFAUT]
+
+
+def test_codes_hors_du_jeu():
+    jeu = decks.deck("tshirt")
+    assert decks.code_valide(jeu, 0) and decks.code_valide(jeu, len(jeu["labels"]) - 1)
+    for code in (len(jeu["labels"]), -1, True, "M", 2.0, None):
+        assert not decks.code_valide(jeu, code)
+
+
+def test_valeurs_numeriques_sans_cartes_speciales():
+    jeu = decks.deck("fibonacci")
+    codes = [jeu["index"]["3"], jeu["index"]["?"], jeu["index"]["cafe"], jeu["index"]["13"]]
+    assert decks.valeurs_numeriques(jeu, codes) == [3, 13]
+
+
+def voter(partie, deck, code):
+    game_id, _, sio = partie(joueurs=1, deck=deck)
+    sio.emit("add_problem", {"game_id": game_id, "problem": "Connexion"})
+    sio.emit("select_problem", {"game_id": game_id, "problem": 1})
+    sio.emit("cast_vote", {"game_id": game_id, "problem": 1, "vote": code, "round": 1})
+    return game_id, sio
+
+
+def test_carte_hors_du_jeu_de_la_partie_refusee(partie):
+    # 11 existe dans Fibonacci (cafe) mais pas dans le jeu T-shirt de la partie
+    game_id, _ = voter(partie, "tshirt", 11)
+    assert games[game_id]["votes"][1] == {}
+
+
+@pytest.mark.parametrize("deck, libelle, resultat", [("fibonacci", "5", 5), ("tshirt", "L", "L"), ("puissances_2", "16", 16)])
+def test_devoilement_renvoie_le_libelle_de_la_carte(partie, deck, libelle, resultat):
+    game_id, sio = voter(partie, deck, decks.deck(deck)["index"][libelle])
+    sio.get_received()
+    sio.emit("devoiler_vote", {"game_id": game_id, "problem": 1, "round": 1})
+
+    unanimes = [message["args"][0] for message in sio.get_received() if message["name"] == "unanimous_vote"]
+    assert [unanime["result"] for unanime in unanimes] == [resultat]
+    assert games[game_id]["concluded_votes"][1] == resultat
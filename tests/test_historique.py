@@ -0,0 +1,61 @@
+import pytest
+
+from extensions import games
+from services import historique, sharding
+
+
+@pytest.fixture(autouse=True)
+def dossier(app, monkeypatch, tmp_path):
+    monkeypatch.setattr(app, "instance_path", str(tmp_path))
+    monkeypatch.setattr(historique, "_jeux", [])
+    monkeypatch.setattr(historique, "_indices", {})
+    monkeypatch.setattr(historique, "_ouvert", False)
+    monkeypatch.setattr(historique, "_en_attente", {colonne: [] for colonne in historique.COLONNES})
+
+
+def partie(game_id, session):
+    games[game_id] = {"session": session}
+
+
+def test_identifiant_reutilise_nouvelle_session():
+    partie("1234", "premiere")
+    historique.enregistrer("1234", 1, 1, {"alice": 3})
+    partie("1234", "seconde")
+    historique.enregistrer("1234", 1, 1, {"alice": 5})
+    historique.vider()
+
+    colonnes = historique.lire()
+    assert list(colonnes["game"]) == [0, 1]
+    assert list(colonnes["card"]) == [3, 5]
+    assert historique.jeux() == ["1234", "1234"]
+
+
+def test_sessions_relues_apres_redemarrage(monkeypatch):
+    partie("1234", "premiere")
+    historique.enregistrer("1234", 1, 1, {"alice": 3})
+    historique.vider()
+
+    monkeypatch.setattr(historique, "_jeux", [])
+    monkeypatch.setattr(historique, "_indices", {})
+    monkeypatch.setattr(historique, "_ouvert", False)
+    historique.enregistrer("1234", 2, 1, {"alice": 8})
+    historique.vider()
+    assert list(historique.lire()["game"]) == [0, 0]
+
+
+def test_dossier_propre_a_chaque_worker(app, monkeypatch):
+    monkeypatch.setitem(app.config, "SHARD_URL", "")
+    assert sharding.par_worker("historique") == "historique"
+    monkeypatch.setitem(app.config, "SHARD_URL", "http://localhost:5001")
+    assert sharding.par_worker("historique") == "historique.localhost_5001"
+    assert sharding.par_worker("parties.json") == "parties.localhost_5001.json"
+
+
+def test_valeur_hors_bornes_ignoree_sans_bloquer_l_historique():
+    partie("1234", "longue")
+    historique.enregistrer("1234", 1, 65536, {"alice": 3})
+    historique.enregistrer("1234", 1, 65535, {"alice": 5})
+    historique.vider()
+
+    assert list(historique.lire()["round"]) == [65535]
+    assert not historique._en_attente["game"]
@@ -0,0 +1,42 @@
+from app import app as application
+from extensions import games, socketio
+from services import identite
+
+
+def test_pseudo_resolu_a_la_connexion(connexion):
+    _, sio = connexion("alice")
+    sid = list(identite.utilisateurs)[-1]  # Dernière connexion ouverte
+    assert identite.pseudo(sid) == "alice" and identite.id_utilisateur("alice") == identite.utilisateur(sid)["id"]
+
+    sio.disconnect()
+    assert identite.utilisateur(sid) is None
+
+
+def test_pseudo_envoye_par_le_client_ignore(partie, connexion):
+    game_id, _, alice = partie()
+    _, bob = connexion("bob")
+    bob.emit("join_room", {"game_id": game_id, "pseudo": "alice"})
+    assert games[game_id]["players"] == ["alice", "bob"]
+
+    alice.emit("add_problem", {"game_id": game_id, "problem": "Connexion"})
+    alice.emit("select_problem", {"game_id": game_id, "problem": 1})
+    bob.emit("cast_vote", {"game_id": game_id, "problem": 1, "vote": 3, "round": 1, "pseudo": "alice"})
+    assert games[game_id]["votes"][1] == {"bob": 3}
+
+
+def test_client_sans_session_refuse(partie):
+    game_id, _, _ = partie()
+    anonyme = socketio.test_client(application)
+    anonyme.emit("join_room", {"game_id": game_id, "pseudo": "alice"})
+    anonyme.emit("cast_vote", {"game_id": game_id, "problem": 1, "vote": 3, "round": 1, "pseudo": "alice"})
+
+    assert [message["name"] for message in anonyme.get_received()] == ["error"]
+    assert games[game_id]["players"] == ["alice"]
+
+
+def test_seul_l_hote_demarre(partie, connexion):
+    game_id, _, _ = partie()
+    _, bob = connexion("bob")
+    bob.emit("join_room", {"game_id": game_id})
+    bob.emit("start_game", {"game_id": game_id, "pseudo": "alice"})
+    assert games[game_id]["status"] == "waiting"
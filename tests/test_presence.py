@@ -0,0 +1,47 @@
+import pytest
+
+from extensions import games
+from services import presence
+
+
+@pytest.fixture(autouse=True)
+def vide(monkeypatch):
+    for nom in ("sessions", "connexions", "en_attente"):
+        monkeypatch.setattr(presence, nom, {})
+    monkeypatch.setattr(presence, "a_publier", set())
+
+
+def test_dernier_onglet_ferme_met_le_joueur_en_attente():
+    presence.connecter("s1", "1234", "alice")
+    presence.connecter("s2", "1234", "alice")
+
+    presence.deconnecter("s1")
+    assert ("1234", "alice") not in presence.en_attente
+
+    presence.deconnecter("s2")
+    assert ("1234", "alice") in presence.en_attente
+    assert presence.deconnecter("s2") is None
+
+
+def test_reconnexion_pendant_le_delai_de_grace(app, partie):
+    game_id, _, sio = partie()
+    sio.disconnect()
+    depuis = presence.en_attente[(game_id, "alice")]
+
+    presence.connecter("autre", game_id, "alice")
+    presence.expirer(maintenant=depuis + app.config["PRESENCE_GRACE"] + 1)
+    assert games[game_id]["players"] == ["alice"]
+
+
+def test_joueur_retire_apres_le_delai_de_grace(app, partie, connexion):
+    game_id, _, _ = partie(joueurs=3)
+    _, bob = connexion("bob")
+    bob.emit("join_room", {"game_id": game_id})
+    bob.disconnect()
+    depuis = presence.en_attente[(game_id, "bob")]
+
+    presence.expirer(maintenant=depuis + app.config["PRESENCE_GRACE"] - 1)
+    assert "bob" in games[game_id]["players"]
+
+    presence.expirer(maintenant=depuis + app.config["PRESENCE_GRACE"])
+    assert games[game_id]["players"] == ["alice"]
@@ -0,0 +1,89 @@
+import pytest
+
+from extensions import games
+from services import ratelimit
+
+
+@pytest.fixture(autouse=True)
+def seaux(monkeypatch):
+    monkeypatch.setattr(ratelimit, "_seaux", {})
+
+
+def recus(sio, nom):
+    return [message["args"][0] for message in sio.get_received() if message["name"] == nom]
+
+
+def avec_problemes(partie, textes):
+    game_id, client, sio = partie()
+    sio.emit("add_problems", {"game_id": game_id, "problems": textes})
+    sio.get_received()
+    return game_id, sio
+
+
+def test_ajout_groupe_sans_doublons(partie):
+    game_id, _, sio = partie()
+    sio.emit("add_problems", {"game_id": game_id, "problems": ["A", "B", "A"]})
+    sio.emit("add_problems", {"game_id": game_id, "problems": ["B", "C"]})
+
+    ajouts = recus(sio, "problems_added")
+    assert [[probleme["text"] for probleme in ajout["problems"]] for ajout in ajouts] == [["A", "B"], ["C"]]
+    assert games[game_id]["problems"] == [1, 2, 3]
+
+
+@pytest.mark.parametrize("problems", [["A", ""], ["A", 3], "A", None])
+def test_ajout_groupe_invalide_refuse(partie, problems):
+    game_id, _, sio = partie()
+    sio.emit("add_problems", {"game_id": game_id, "problems": problems})
+    assert recus(sio, "error")
+    assert games[game_id]["problems"] == []
+
+
+def test_ajout_groupe_limite_en_taille(app, partie):
+    game_id, _, sio = partie()
+    sio.emit("add_problems", {"game_id": game_id, "problems": [f"Story {numero}" for numero in range(app.config["PROBLEM_BATCH_MAX"] + 1)]})
+    assert recus(sio, "error")
+    assert games[game_id]["problems"] == []
+
+
+def test_reordonner(partie):
+    game_id, sio = avec_problemes(partie, ["A", "B", "C"])
+    sio.emit("reorder_problems", {"game_id": game_id, "problems": [3, 1, 2]})
+    assert recus(sio, "problems_updated") == [{"problems": [3, 1, 2]}]
+    assert games[game_id]["problems"] == [3, 1, 2]
+
+
+@pytest.mark.parametrize("ordre", [[1, 2], [1, 2, 2], [1, 2, 4], [1, 2, 3, 3], [True, 2, 3], ["1", "2", "3"]])
+def test_reordonner_sans_permutation_refuse(partie, ordre):
+    game_id, sio = avec_problemes(partie, ["A", "B", "C"])
+    sio.emit("reorder_problems", {"game_id": game_id, "problems": ordre})
+    assert recus(sio, "error")
+    assert games[game_id]["problems"] == [1, 2, 3]
+
+
+def test_retirer_ignore_les_identifiants_inconnus(partie):
+    game_id, sio = avec_problemes(partie, ["A", "B", "C"])
+    sio.emit("select_problem", {"game_id": game_id, "problem": 2})
+    sio.emit("remove_problems", {"game_id": game_id, "problems": [2, 2, 9]})
+
+    assert recus(sio, "problems_updated") == [{"problems": [1, 3]}]
+    game = games[game_id]
+    assert game["problem_texts"] == {1: "A", 3: "C"} and set(game["problem_index"]) == {"A", "C"}
+    assert 2 not in game["votes"] and 2 not in game["rounds"] and "current_problem" not in game
+
+
+def test_retirer_seulement_inconnus_sans_effet(partie):
+    game_id, sio = avec_problemes(partie, ["A"])
+    sio.emit("remove_problems", {"game_id": game_id, "problems": [7]})
+    assert not recus(sio, "problems_updated")
+    sio.emit("remove_problems", {"game_id": game_id, "problems": ["A"]})
+    assert recus(sio, "error")
+    assert games[game_id]["problems"] == [1]
+
+
+def test_operations_reservees_a_l_hote(partie, connexion):
+    game_id, sio = avec_problemes(partie, ["A", "B"])
+    _, bob = connexion("bob")
+    bob.emit("join_room", {"game_id": game_id})
+    bob.emit("reorder_problems", {"game_id": game_id, "problems": [2, 1]})
+    bob.emit("remove_problems", {"game_id": game_id, "problems": [1]})
+    assert games[game_id]["problems"] == [1, 2]
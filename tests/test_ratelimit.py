@@ -0,0 +1,49 @@
+import pytest
+
+from services import ratelimit, presence
+
+
+@pytest.fixture(autouse=True)
+def seaux(app, monkeypatch):
+    monkeypatch.setattr(ratelimit, "_seaux", {})
+    monkeypatch.setattr(ratelimit, "_ignores", {})
+    monkeypatch.setattr(presence, "sessions", {})
+    monkeypatch.setitem(app.config, "RATE_LIMITS", {"default": {"sid": (3, 1), "room": (4, 2)}})
+
+
+def test_seau_vide_puis_recharge():
+    assert all(ratelimit.autoriser("cast_vote", "a", maintenant=0) for _ in range(3))
+    assert not ratelimit.autoriser("cast_vote", "a", maintenant=0)
+
+    # Un jeton par seconde, sans dépasser la capacité
+    assert ratelimit.autoriser("cast_vote", "a", maintenant=1)
+    assert not ratelimit.autoriser("cast_vote", "a", maintenant=1)
+    assert sum(ratelimit.autoriser("cast_vote", "a", maintenant=100) for _ in range(5)) == 3
+
+
+def test_seaux_separes_par_sid_et_evenement():
+    for _ in range(3):
+        ratelimit.autoriser("cast_vote", "a", maintenant=0)
+    assert ratelimit.autoriser("cast_vote", "b", maintenant=0)
+    assert ratelimit.autoriser("add_problem", "a", maintenant=0)
+
+
+def test_seau_de_la_partie_rejointe():
+    presence.sessions.update({sid: ("1234", sid) for sid in "abc"})
+    assert sum(ratelimit.autoriser("cast_vote", sid, maintenant=0) for sid in "ab" for _ in range(3)) == 4
+
+    # Le seau de c est plein, celui de la partie est vide
+    assert not ratelimit.autoriser("cast_vote", "c", maintenant=0)
+
+
+def test_client_exterieur_sans_effet_sur_la_partie():
+    presence.sessions["hote"] = ("1234", "alice")
+    for indice in range(50):
+        ratelimit.autoriser("cast_vote", f"intrus-{indice}", maintenant=0)
+    assert ratelimit.autoriser("cast_vote", "hote", maintenant=0)
+
+
+def test_nettoyer_retire_les_seaux_inactifs(app):
+    ratelimit.autoriser("cast_vote", "a", maintenant=0)
+    ratelimit.nettoyer(maintenant=app.config["RATE_LIMIT_IDLE"] + 1)
+    assert not ratelimit._seaux
@@ -0,0 +1,106 @@
+import pytest
+
+from extensions import games
+from services import scheduler, presence
+
+
+@pytest.fixture(autouse=True)
+def echeancier(monkeypatch):
+    monkeypatch.setattr(scheduler, "_taches", [])
+    monkeypatch.setattr(scheduler, "_annulees", set())
+    # Un cycle périodique se replanifie sans fin quand l'horloge est avancée
+    monkeypatch.setattr(scheduler, "periodique", lambda intervalle, fonction: None)
+
+
+def test_taches_echues_executees_dans_l_ordre():
+    appels = []
+    scheduler.planifier(2, appels.append, "b")
+    scheduler.planifier(1, appels.append, "a")
+    scheduler.planifier(60, appels.append, "plus tard")
+
+    scheduler.executer(maintenant=scheduler._taches[0][0] + 1)
+    assert appels == ["a", "b"]
+    assert len(scheduler._taches) == 1
+
+
+def test_tache_annulee_jamais_executee():
+    appels = []
+    jeton = scheduler.planifier(1, appels.append, "annulée")
+    scheduler.planifier(1, appels.append, "gardée")
+    scheduler.annuler(jeton)
+    scheduler.annuler(None)
+
+    scheduler.executer(maintenant=scheduler._taches[0][0] + 1)
+    assert appels == ["gardée"]
+    assert not scheduler._taches and not scheduler._annulees
+
+
+def test_erreur_sans_effet_sur_les_autres_taches():
+    appels = []
+    scheduler.planifier(1, lambda: 1 / 0)
+    scheduler.planifier(1, appels.append, "suivante")
+
+    scheduler.executer(maintenant=scheduler._taches[0][0] + 1)
+    assert appels == ["suivante"]
+
+
+def test_minuteur_devoile_le_tour(partie, connexion):
+    game_id, _, sio = partie(joueurs=2, duree=30)
+    _, bob = connexion("bob")
+    bob.emit("join_room", {"game_id": game_id})
+    sio.emit("add_problem", {"game_id": game_id, "problem": "Connexion"})
+    sio.emit("select_problem", {"game_id": game_id, "problem": 1})
+    sio.emit("cast_vote", {"game_id": game_id, "problem": 1, "vote": 3, "round": 1})
+    jeton = games[game_id]["minuteur"]
+
+    # bob n'a pas voté : le tour est dévoilé à l'échéance, sans unanimité un second tour s'ouvre
+    scheduler.executer(maintenant=max(scheduler._taches)[0])
+    assert games[game_id]["rounds"][1] == {"id": 2, "etat": "ouvert"}
+    assert games[game_id]["minuteur"] != jeton
+
+
+def test_minuteur_annule_quand_la_partie_se_vide(app, partie):
+    game_id, _, sio = partie(joueurs=2, duree=30)
+    sio.emit("add_problem", {"game_id": game_id, "problem": "Connexion"})
+    sio.emit("select_problem", {"game_id": game_id, "problem": 1})
+    jeton = games[game_id]["minuteur"]
+
+    sio.disconnect()
+    presence.expirer(maintenant=presence.en_attente[(game_id, "alice")] + app.config["PRESENCE_GRACE"])
+    assert game_id not in games
+    assert jeton in scheduler._annulees
+
+
+def test_tache_replanifiee_sans_delai_attend_le_passage_suivant():
+    appels = []
+
+    def boucle():
+        appels.append(1)
+        scheduler.planifier(0, boucle)
+
+    scheduler.planifier(0, boucle)
+    scheduler.executer(maintenant=scheduler._taches[0][0] + 60)
+    assert appels == [1]
+    assert len(scheduler._taches) == 1
+
+
+@pytest.mark.parametrize("duree", ["-5", "abc", "45", "1e9"])
+def test_duree_de_tour_invalide_refusee(connexion, duree):
+    client, _ = connexion("alice")
+    reponse = client.post("/dashboard", data={"create_game": "1", "game_mode": "moyenne", "number_player": "2",
+                                              "deck": "fibonacci", "round_duration": duree})
+    assert reponse.status_code == 200
+    assert "Durée de tour invalide".encode() in reponse.data
+    assert not games
+
+
+def test_minuteur_rearme_quand_le_probleme_est_reselectionne(partie):
+    game_id, _, sio = partie(joueurs=2, duree=30)
+    sio.emit("add_problems", {"game_id": game_id, "problems": ["A", "B"]})
+    sio.emit("select_problem", {"game_id": game_id, "problem": 1})
+    sio.emit("select_problem", {"game_id": game_id, "problem": 2})
+    sio.emit("select_problem", {"game_id": game_id, "problem": 1})
+
+    minuteurs = [tache for tache in scheduler._taches if tache[1] not in scheduler._annulees]
+    assert [tache[3] for tache in minuteurs] == [(game_id, 1, 1)]
+    assert games[game_id]["minuteur"] == minuteurs[0][1]
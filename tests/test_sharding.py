@@ -0,0 +1,106 @@
+import http.server
+import threading
+import time
+
+import pytest
+
+from extensions import games, socketio
+from services import persistance, sharding
+
+SHARDS = ["http://a:5000", "http://b:5000", "http://c:5000"]
+
+
+@pytest.fixture(autouse=True)
+def anneau(app, monkeypatch):
+    monkeypatch.setitem(app.config, "SHARD_URL", SHARDS[0])
+    yield
+    sharding.configurer([])
+
+
+def proprietaires(ids):
+    return {game_id: sharding.proprietaire(game_id) for game_id in ids}
+
+
+def test_sans_shards_tout_est_local():
+    sharding.configurer([])
+    assert not sharding.actif()
+    assert sharding.est_local("1234")
+
+
+def test_repartition_entre_les_workers():
+    sharding.configurer(SHARDS)
+    comptes = {shard: 0 for shard in SHARDS}
+    for proprietaire in proprietaires(map(str, range(1000, 10000))).values():
+        comptes[proprietaire] += 1
+    assert all(2000 < compte < 4000 for compte in comptes.values())
+
+
+def test_ajout_d_un_shard_ne_deplace_que_ses_parties():
+    ids = [str(game_id) for game_id in range(1000, 10000)]
+    sharding.configurer(SHARDS)
+    avant = proprietaires(ids)
+
+    sharding.configurer(SHARDS + ["http://d:5000"])
+    apres = proprietaires(ids)
+
+    deplaces = [game_id for game_id in ids if avant[game_id] != apres[game_id]]
+    assert all(apres[game_id] == "http://d:5000" for game_id in deplaces)
+    assert 0.15 < len(deplaces) / len(ids) < 0.35
+
+
+def test_retrait_d_un_shard_ne_deplace_que_ses_parties():
+    ids = [str(game_id) for game_id in range(1000, 10000)]
+    sharding.configurer(SHARDS)
+    avant = proprietaires(ids)
+
+    sharding.configurer(SHARDS[:2])
+    apres = proprietaires(ids)
+    assert all(avant[game_id] == apres[game_id] for game_id in ids if avant[game_id] != SHARDS[2])
+
+
+def test_aucun_identifiant_local(app, connexion):
+    sharding.configurer(SHARDS[1:])
+    client, _ = connexion("alice")
+    reponse = client.post("/dashboard", data={"create_game": "1", "game_mode": "moyenne", "number_player": "2"})
+    assert reponse.status_code == 200
+    assert "Aucun identifiant de partie disponible".encode() in reponse.data
+
+
+def test_import_renvoye_sans_doublon(app, monkeypatch, partie):
+    monkeypatch.setitem(app.config, "SHARD_TOKEN", "secret")
+    game_id, client, _ = partie()
+    donnees = {"game_id": game_id, "game": persistance.exporter(games[game_id])}
+    entetes = {"X-Shard-Token": "secret"}
+
+    assert client.post("/shard/import", json=donnees, headers=entetes).status_code == 200
+    assert games[game_id]["session"] == donnees["game"]["session"]
+
+    autre = dict(donnees, game=dict(donnees["game"], session="autre"))
+    assert client.post("/shard/import", json=autre, headers=entetes).status_code == 409
+    assert games[game_id]["session"] == donnees["game"]["session"]
+
+
+def test_envoi_sans_bloquer_le_worker(app):
+    class Lent(http.server.BaseHTTPRequestHandler):
+        def do_POST(self):
+            time.sleep(0.3)
+            self.send_response(200)
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    serveur = http.server.HTTPServer(("127.0.0.1", 0), Lent)
+    threading.Thread(target=serveur.handle_request, daemon=True).start()
+
+    ticks = []
+
+    def horloge():
+        while len(ticks) < 100:
+            ticks.append(1)
+            socketio.sleep(0.01)
+
+    socketio.start_background_task(horloge)
+    assert sharding.envoyer(f"http://127.0.0.1:{serveur.server_port}", "/shard/import", {})
+    assert len(ticks) > 5
+    serveur.server_close()
@@ -0,0 +1,37 @@
+from collections import defaultdict
+
+import pytest
+
+from extensions import socketio
+from services import suggestions
+
+
+@pytest.fixture(autouse=True)
+def index(monkeypatch):
+    for nom, valeur in (("_postings", defaultdict(dict)), ("_normes", []), ("_documents", []),
+                        ("_base", 1), ("_recalcul", False), ("_demarre", True)):
+        monkeypatch.setattr(suggestions, nom, valeur)
+    taches = []
+    monkeypatch.setattr(socketio, "start_background_task", lambda cible, *args: taches.append(cible))
+    return taches
+
+
+def test_probleme_semblable_suggere():
+    suggestions.ajouter("Page de connexion utilisateur", 5)
+    suggestions.ajouter("Export des factures en PDF", 13)
+    suggestions.ajouter("Export des commandes en CSV", 8)
+
+    resultat, = suggestions.suggerer(["Connexion utilisateur par mot de passe"])
+    assert resultat["difficulte"] == 5
+    assert suggestions.suggerer(["Paramètres"]) == [None]
+
+
+def test_recalcul_des_normes_en_tache_de_fond(index):
+    for numero in range(8):
+        suggestions.ajouter(f"Story {numero} commune", numero)
+
+    # Un seul recalcul lancé tant que le précédent n'a pas tourné, jamais dans ajouter
+    assert index == [suggestions._recalculer]
+    suggestions._recalculer()
+    assert suggestions._normes == [suggestions._norme(mots) for _, _, mots in suggestions._documents]
+    assert not suggestions._recalcul
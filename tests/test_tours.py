@@ -0,0 +1,63 @@
+from extensions import games
+from services import analytique
+
+
+def recus(sio, nom):
+    return [message["args"][0] for message in sio.get_received() if message["name"] == nom]
+
+
+def preparer(partie, connexion):
+    game_id, _, alice = partie(joueurs=2)
+    _, bob = connexion("bob")
+    bob.emit("join_room", {"game_id": game_id})
+    alice.emit("add_problem", {"game_id": game_id, "problem": "Connexion"})
+    alice.emit("select_problem", {"game_id": game_id, "problem": 1})
+    return game_id, alice, bob
+
+
+def test_vote_d_un_autre_tour_ignore(partie, connexion):
+    game_id, alice, bob = preparer(partie, connexion)
+    bob.emit("cast_vote", {"game_id": game_id, "problem": 1, "vote": 3, "round": 2})
+    bob.emit("cast_vote", {"game_id": game_id, "problem": 1, "vote": 3})
+    assert games[game_id]["votes"][1] == {}
+
+    bob.emit("cast_vote", {"game_id": game_id, "problem": 1, "vote": 3, "round": 1})
+    assert games[game_id]["votes"][1] == {"bob": 3}
+
+
+def test_vote_apres_devoilement_ignore(partie, connexion):
+    game_id, alice, bob = preparer(partie, connexion)
+    alice.emit("cast_vote", {"game_id": game_id, "problem": 1, "vote": 3, "round": 1})
+    alice.emit("devoiler_vote", {"game_id": game_id, "problem": 1, "round": 1})
+
+    # Sans unanimité, le tour 2 s'ouvre : un vote retardataire du tour 1 n'y entre pas
+    bob.emit("cast_vote", {"game_id": game_id, "problem": 1, "vote": 5, "round": 1})
+    assert games[game_id]["rounds"][1] == {"id": 2, "etat": "ouvert"}
+    assert games[game_id]["votes"][1] == {}
+
+
+def test_second_devoilement_sans_effet(partie, connexion, monkeypatch):
+    monkeypatch.setattr(analytique, "stats", {portee: {} for portee in analytique.PORTEES})
+    game_id, alice, bob = preparer(partie, connexion)
+    for sio in (alice, bob):
+        sio.emit("cast_vote", {"game_id": game_id, "problem": 1, "vote": 3, "round": 1})
+    alice.get_received()
+
+    alice.emit("devoiler_vote", {"game_id": game_id, "problem": 1, "round": 1})
+    bob.emit("devoiler_vote", {"game_id": game_id, "problem": 1, "round": 1})
+    alice.emit("devoiler_vote", {"game_id": game_id, "problem": 1, "round": 1})
+
+    assert len(recus(alice, "unanimous_vote")) == 1
+    assert games[game_id]["rounds"][1] == {"id": 1, "etat": "conclu"}
+    assert analytique.stats["user"]["alice"]["votes"] == 1
+    assert analytique.stats["mode"]["moyenne"]["conclusions"] == 1
+
+
+def test_votes_en_attente_envoyes_avant_le_nouveau_tour(partie, connexion):
+    game_id, alice, bob = preparer(partie, connexion)
+    bob.emit("cast_vote", {"game_id": game_id, "problem": 1, "vote": 3, "round": 1})
+    alice.get_received()
+
+    alice.emit("start_vote", {"game_id": game_id, "problem": 1})
+    noms = [message["name"] for message in alice.get_received() if message["name"] in ("update_votes", "vote_started")]
+    assert noms == ["update_votes", "vote_started"]
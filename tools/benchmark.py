@@ -0,0 +1,155 @@
+"""Charge scriptée identique contre le serveur eventlet et le serveur ASGI.
+
+Chaque client rejoint une partie puis, une fois par seconde, envoie un vote et
+redemande l'état de la partie (join_room -> game_state, dont on mesure l'aller-retour).
+
+    python tools/benchmark.py --url http://localhost:5000
+    python tools/benchmark.py --compare --rooms 20 --clients 10 --duree 30
+"""
+import argparse
+import asyncio
+import http.cookiejar
+import os
+import statistics
+import subprocess
+import sys
+import time
+import urllib.parse
+import urllib.request
+
+import socketio
+
+RACINE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SERVEURS = {
+    "eventlet": lambda port: [sys.executable, "-c", f"from app import app, socketio; socketio.run(app, port={port})"],
+    "asgi": lambda port: [sys.executable, "-m", "uvicorn", "asgi:application", "--port", str(port), "--log-level", "warning"],
+}
+
+
+def connexion_http(url, pseudo):
+    # Session Flask du joueur de test : inscription, ou connexion si le pseudo existe déjà
+    cookies = http.cookiejar.CookieJar()
+    client = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(cookies))
+    for chemin in ("/login", "/"):
+        reponse = client.open(url + chemin, urllib.parse.urlencode({"pseudo": pseudo}).encode())
+        if reponse.geturl().endswith("/dashboard"):
+            return client, "; ".join(f"{cookie.name}={cookie.value}" for cookie in cookies)
+    raise RuntimeError("Connexion impossible")
+
+
+def creer_partie(client, url, joueurs, mode="moyenne", deck="fibonacci", duree=0):
+    formulaire = {"create_game": "1", "game_mode": mode, "number_player": joueurs, "deck": deck, "round_duration": duree}
+    reponse = client.open(url + "/dashboard", urllib.parse.urlencode(formulaire).encode())
+    return reponse.geturl().rsplit("/", 1)[-1]
+
+
+async def joueur(url, cookie, game_id, indice, fin, mesures):
+    sio = socketio.AsyncClient()
+    etat = {"round": None, "attente": None}
+    recu = asyncio.Event()
+
+    @sio.on("game_state")
+    def game_state(data):
+        if etat["attente"] is not None:
+            mesures["latences"].append(time.perf_counter() - etat["attente"])
+            etat["attente"] = None
+        if etat["round"] is None and data["rounds"]:
+            etat["round"] = data["rounds"].get("1")
+        recu.set()
+
+    @sio.on("problem_selected")
+    def problem_selected(data):
+        etat["round"] = data["round"]
+
+    @sio.on("update_votes")
+    def update_votes(data):
+        mesures["diffusions"] += 1
+
+    await sio.connect(url, headers={"Cookie": cookie}, transports=["websocket"])
+    await sio.emit("join_room", {"game_id": game_id})
+    await recu.wait()
+
+    # Le premier joueur de chaque partie prépare le problème voté par tous
+    if indice == 0:
+        await sio.emit("add_problem", {"game_id": game_id, "problem": "Story de charge"})
+        await sio.emit("select_problem", {"game_id": game_id, "problem": 1})
+
+    while time.perf_counter() < fin:
+        if etat["round"] is not None:
+            await sio.emit("cast_vote", {"game_id": game_id, "problem": 1, "vote": indice % 5, "round": etat["round"]})
+            mesures["evenements"] += 1
+        if etat["attente"] is None:
+            etat["attente"] = time.perf_counter()
+            await sio.emit("join_room", {"game_id": game_id})
+            mesures["evenements"] += 1
+        await asyncio.sleep(1)
+
+    await sio.disconnect()
+
+
+async def charge(url, rooms, clients, duree):
+    client, _ = connexion_http(url, "bench")
+    parties = [creer_partie(client, url, clients + 1) for _ in range(rooms)]
+    mesures = {"latences": [], "evenements": 0, "diffusions": 0}
+
+    # Le serveur identifie chaque joueur par sa session : un compte par joueur
+    cookies = [connexion_http(url, f"bench-{indice}")[1] for indice in range(rooms * clients)]
+
+    debut = time.perf_counter()
+    fin = debut + duree
+    await asyncio.gather(*(joueur(url, cookies[numero * clients + indice], game_id, indice, fin, mesures)
+                           for numero, game_id in enumerate(parties) for indice in range(clients)))
+    mesures["duree"] = time.perf_counter() - debut
+    return mesures
+
+
+def rapport(nom, mesures):
+    latences = sorted(mesures["latences"])
+    if not latences:
+        return f"{nom:10} aucune réponse"
+    centile = lambda p: latences[min(len(latences) - 1, int(p * len(latences)))] * 1000
+    return (f"{nom:10} événements/s {mesures['evenements'] / mesures['duree']:8.1f}   "
+            f"diffusions/s {mesures['diffusions'] / mesures['duree']:8.1f}   "
+            f"aller-retour ms p50 {statistics.median(latences) * 1000:7.1f}  p95 {centile(0.95):7.1f}  p99 {centile(0.99):7.1f}")
+
+
+def attendre_serveur(url, delai=20):
+    limite = time.monotonic() + delai
+    while time.monotonic() < limite:
+        try:
+            urllib.request.urlopen(url + "/login")
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"Le serveur {url} ne répond pas")
+
+
+def comparer(args):
+    for nom, commande in SERVEURS.items():
+        processus = subprocess.Popen(commande(args.port), cwd=RACINE)
+        try:
+            url = f"http://localhost:{args.port}"
+            attendre_serveur(url)
+            print(rapport(nom, asyncio.run(charge(url, args.rooms, args.clients, args.duree))), flush=True)
+        finally:
+            processus.terminate()
+            processus.wait()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="Serveur déjà lancé à mesurer")
+    parser.add_argument("--compare", action="store_true", help="Lance successivement les serveurs eventlet et ASGI")
+    parser.add_argument("--port", type=int, default=5050)
+    parser.add_argument("--rooms", type=int, default=10)
+    parser.add_argument("--clients", type=int, default=10, help="Joueurs par partie")
+    parser.add_argument("--duree", type=float, default=20, help="Durée de la charge en secondes")
+    args = parser.parse_args()
+
+    if args.compare:
+        comparer(args)
+    elif args.url:
+        print(rapport(args.url, asyncio.run(charge(args.url, args.rooms, args.clients, args.duree))))
+    else:
+        parser.error("--url ou --compare requis")
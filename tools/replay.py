@@ -0,0 +1,142 @@
+"""Rejoue une trace enregistrée avec TRACE_FILE contre une instance locale.
+
+Chaque connexion de la trace devient un client Socket.IO connecté avec le compte
+de son joueur (anonymisé), les parties sont recréées avec les mêmes paramètres et
+les événements sont renvoyés au même rythme, accéléré d'un facteur --vitesse.
+La latence est mesurée jusqu'à l'accusé de réception du serveur (fin du gestionnaire).
+
+    TRACE_FILE=lundi.jsonl python app.py
+    python tools/replay.py lundi.jsonl --url http://localhost:5000 --vitesse 20
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from collections import defaultdict
+
+import socketio
+
+from benchmark import connexion_http, creer_partie
+
+
+def charger(chemin):
+    with open(chemin, encoding="utf-8") as fichier:
+        lignes = [json.loads(ligne) for ligne in fichier if ligne.strip()]
+    return [ligne for ligne in lignes if ligne["event"] != "@start"]
+
+
+class Rejeu:
+    def __init__(self, url, trace, vitesse):
+        self.url = url
+        self.trace = trace
+        self.vitesse = vitesse
+        self.comptes = {}             # joueur anonymisé -> (client HTTP, cookie)
+        self.parties = {}             # game_id de la trace -> game_id recréé
+        self.files = {}               # connexion de la trace -> file d'événements
+        self.uploads = {}             # connexion -> futur de l'identifiant créé par upload_backlog
+        self.latences = defaultdict(list)
+        self.trames = 0
+        self.retard = 0.0
+
+    def compte(self, joueur):
+        if joueur not in self.comptes:
+            self.comptes[joueur] = connexion_http(self.url, f"replay-{joueur}")
+        return self.comptes[joueur]
+
+    def traduire(self, donnees):
+        if isinstance(donnees, dict) and "game_id" in donnees:
+            return dict(donnees, game_id=self.parties.get(donnees["game_id"], donnees["game_id"]))
+        return donnees
+
+    async def connexion(self, numero, joueur, file):
+        sio = socketio.AsyncClient()
+        self.uploads[numero] = asyncio.get_running_loop().create_future()
+
+        @sio.on("*")
+        def trame(evenement, *args):
+            self.trames += 1
+            if evenement == "redirect_to_game_room" and not self.uploads[numero].done():
+                self.uploads[numero].set_result(args[0]["game_id"])
+
+        headers = {"Cookie": self.compte(joueur)[1]} if joueur else {}
+        debut = time.perf_counter()
+        await sio.connect(self.url, headers=headers, transports=["websocket"])
+        self.latences["connect"].append(time.perf_counter() - debut)
+
+        # Les événements d'une connexion partent dans l'ordre de la trace, sans attendre les accusés
+        while (ligne := await file.get()) is not None:
+            if ligne["event"] == "disconnect":
+                break
+            envoi = time.perf_counter()
+            await sio.emit(ligne["event"], self.traduire(ligne["data"]),
+                           callback=lambda *_, evenement=ligne["event"], envoi=envoi:
+                           self.latences[evenement].append(time.perf_counter() - envoi))
+        await asyncio.sleep(0.5)  # Laisse arriver les derniers accusés
+        await sio.disconnect()
+
+    async def recreer(self, ligne):
+        if ligne["upload"] is not None:
+            future = self.uploads.get(ligne["upload"])
+            if future is not None:
+                self.parties[ligne["game_id"]] = await asyncio.wait_for(future, 10)
+            return
+        client, _ = self.compte(ligne["host"])
+        self.parties[ligne["game_id"]] = await asyncio.to_thread(
+            creer_partie, client, self.url, ligne["number_player"],
+            mode=ligne["mode"], deck=ligne["deck"], duree=ligne["round_duration"])
+
+    async def lancer(self):
+        # Comptes créés avant le départ pour ne pas fausser le rythme
+        for ligne in self.trace:
+            joueur = ligne.get("user") or ligne.get("host")
+            if joueur:
+                await asyncio.to_thread(self.compte, joueur)
+
+        taches = []
+        debut = time.perf_counter()
+        for ligne in self.trace:
+            echeance = debut + ligne["t"] / self.vitesse
+            attente = echeance - time.perf_counter()
+            if attente > 0:
+                await asyncio.sleep(attente)
+            else:
+                self.retard = max(self.retard, -attente)
+
+            if ligne["event"] == "@game":
+                await self.recreer(ligne)
+            elif ligne["event"] == "connect":
+                self.files[ligne["sid"]] = asyncio.Queue()
+                taches.append(asyncio.create_task(self.connexion(ligne["sid"], ligne["user"], self.files[ligne["sid"]])))
+            elif ligne["sid"] in self.files:
+                self.files[ligne["sid"]].put_nowait(ligne)
+
+        for file in self.files.values():
+            file.put_nowait(None)
+        await asyncio.gather(*taches)
+        return time.perf_counter() - debut
+
+
+def rapport(rejeu, duree):
+    print(f"{'événement':20} {'nombre':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    toutes = []
+    for evenement, latences in sorted(rejeu.latences.items()):
+        latences.sort()
+        toutes += latences
+        centile = lambda p: latences[min(len(latences) - 1, int(p * len(latences)))] * 1000
+        print(f"{evenement:20} {len(latences):8} {statistics.median(latences) * 1000:8.1f} {centile(0.95):8.1f} {centile(0.99):8.1f}")
+    print(f"\n{len(toutes)} événements en {duree:.1f} s : {len(toutes) / duree:.1f} événements/s, "
+          f"{rejeu.trames / duree:.1f} trames reçues/s, retard maximal sur la trace {rejeu.retard * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("trace")
+    parser.add_argument("--url", default="http://localhost:5000")
+    parser.add_argument("--vitesse", type=float, default=1, help="Facteur d'accélération (1 à 100)")
+    args = parser.parse_args()
+    if not 1 <= args.vitesse <= 100:
+        parser.error("--vitesse doit être comprise entre 1 et 100")
+
+    rejeu = Rejeu(args.url, charger(args.trace), args.vitesse)
+    rapport(rejeu, asyncio.run(rejeu.lancer()))